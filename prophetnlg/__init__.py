@@ -1,54 +1,193 @@
 from __future__ import annotations
-from typing import Any, Generic, Dict, List, Optional
+import sys
+from typing import Any, Generic, Dict, FrozenSet, List, Optional, Set, Tuple
 import nltk
-from pydantic import BaseModel
+
+
+class Morphology:
+    __slots__ = ('string', 'lemma', 'pos', 'tags')
+
+    def __init__(self, string: str):
+        lemma, _, rest = string.partition('+')
+        pos, *tags = rest.split('+')
+        self.string = string
+        self.lemma = lemma
+        self.pos = sys.intern(pos)
+        self.tags = tuple(sys.intern(t) for t in tags)
+
+    def __repr__(self):
+        return f'Morphology({self.string!r})'
+
+
+_morphologies: Dict[str, Morphology] = {}
+
+
+def parse_morphology(string: str) -> Morphology:
+    # identical morphology strings share one parsed object
+    morphology = _morphologies.get(string)
+    if morphology is None:
+        morphology = _morphologies[string] = Morphology(string)
+    return morphology
 
 
 class DataClassMixin:
-    def replace(self, **attrs):
-        return self.copy(update=attrs)
+    # plain slotted classes are used on the hot path instead of pydantic
+    # models, see prophetnlg.schema for (de)serialization
+    __slots__ = ()
+    _fields: Tuple[str, ...] = ()
+    # slots holding values derived from the fields, reset on replace
+    _cached: Tuple[str, ...] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if '_fields' not in cls.__dict__:
+            cls._fields = cls.__slots__
 
+    def replace(self, **attrs):
+        new = object.__new__(self.__class__)
+        for name in self._fields:
+            setattr(new, name, getattr(self, name))
+        if self._cached:
+            for name in self._cached:
+                setattr(new, name, None)
+        # unknown fields raise AttributeError, as there is no __dict__
+        for name, value in attrs.items():
+            setattr(new, name, value)
+        return new
+
+    def copy(self, update: Optional[Dict[str, Any]] = None):
+        return self.replace(**(update or {}))
+
+    def _items(self):
+        return ((name, getattr(self, name)) for name in self._fields)
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self._fields)
+
+    def __repr__(self):
+        fields = ', '.join(f'{name}={value!r}' for name, value in self._items())
+        return f'{self.__class__.__name__}({fields})'
+
+    def __getstate__(self):
+        return dict(self._items())
+
+    def __setstate__(self, state):
+        for name in self._cached:
+            setattr(self, name, None)
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    # allows the classes to be used as field types of pydantic configs
+    @classmethod
+    def __get_validators__(cls):
+        yield cls.validate
+
+    @classmethod
+    def validate(cls, value):
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, dict):
+            return cls(**value)
+        raise TypeError(f'{cls.__name__} expected')
+
+
+class WordAnalysis(DataClassMixin):
+    __slots__ = ('text', 'original', 'morphologies', '_parsed', '_derived')
+    _fields = ('text', 'original', 'morphologies')
+    _cached = ('_parsed', '_derived')
+    text: str
+    original: Optional[Any]
+    morphologies: Dict[str, float]
+
+    def __init__(
+        self,
+        *,
+        text: str = '',
+        original: Optional[Any] = None,
+        morphologies: Optional[Dict[str, float]] = None
+    ):
+        self.text = text
+        self.original = original
+        self.morphologies = {} if morphologies is None else morphologies
+        self._parsed: Optional[Tuple[Morphology, ...]] = None
+        self._derived: Optional[Tuple[FrozenSet[str], ...]] = None
 
-class WordAnalysis(BaseModel, DataClassMixin):
-    text: str = ''
-    original: Optional[Any] = None
-    morphologies: Dict[str, float] = {}
+    @property
+    def parsed_morphologies(self) -> Tuple[Morphology, ...]:
+        parsed = self._parsed
+        if parsed is None:
+            parsed = self._parsed = tuple(
+                parse_morphology(m) for m in self.morphologies if '+' in m
+            )
+        return parsed
+
+    def _get_derived(self) -> Tuple[FrozenSet[str], ...]:
+        # morphologies, lemmas and parts of speech
+        derived = self._derived
+        if derived is None:
+            parsed = self.parsed_morphologies
+            derived = self._derived = (
+                frozenset(m.string for m in parsed),
+                frozenset(m.lemma for m in parsed),
+                frozenset(m.pos for m in parsed),
+            )
+        return derived
 
     def get_morphologies(self) -> Set[str]:
-        return {m for m in self.morphologies if '+' in m}
+        return set(self._get_derived()[0])
 
     def get_lemmas(self):
-        return {m.split('+', 1)[0] for m in self.morphologies if '+' in m}
+        return set(self._get_derived()[1])
 
     def get_pos(self):
-        return {m.split('+', 2)[1] for m in self.morphologies if '+' in m}
+        return set(self._get_derived()[2])
 
     @property
     def morphology(self):
-        morphologies = self.get_morphologies()
+        morphologies = self._get_derived()[0]
         return next(iter(morphologies)) if len(morphologies) == 1 else ''
 
     @property
     def lemma(self):
-        lemmas = self.get_lemmas()
+        lemmas = self._get_derived()[1]
         return next(iter(lemmas)) if len(lemmas) == 1 else ''
 
     @property
     def pos(self):
-        pos = self.get_pos()
+        pos = self._get_derived()[2]
         return next(iter(pos)) if len(pos) == 1 else ''
 
 
-class SentenceToken(BaseModel, DataClassMixin):
-    text: str = ''
-    lang: str = ''
-    analyses: Dict[str, WordAnalysis] = {}
-    spaces_after: str = ' '
-    cap: bool = False
-    passthrough: bool = False
+class SentenceToken(DataClassMixin):
+    __slots__ = ('text', 'lang', 'analyses', 'spaces_after', 'cap', 'passthrough')
+    text: str
+    lang: str
+    analyses: Dict[str, WordAnalysis]
+    spaces_after: str
+    cap: bool
+    passthrough: int
+
+    def __init__(
+        self,
+        *,
+        text: str = '',
+        lang: str = '',
+        analyses: Optional[Dict[str, WordAnalysis]] = None,
+        spaces_after: str = ' ',
+        cap: bool = False,
+        passthrough: int = False
+    ):
+        self.text = text
+        self.lang = lang
+        self.analyses = {} if analyses is None else analyses
+        self.spaces_after = spaces_after
+        self.cap = cap
+        self.passthrough = passthrough
 
     def with_analysis(self, analysis: WordAnalysis, analysis_type: str) -> SentenceToken:
-        analyses = dict(self.analyses, **{analysis_type: analysis})
+        analyses = {**self.analyses, analysis_type: analysis}
         return self.replace(analyses=analyses)
 
     def with_weighted_morphologies(self, weights: Dict[str, float], analysis_type: str) -> SentenceToken:
@@ -77,10 +216,22 @@ class SentenceToken(BaseModel, DataClassMixin):
 detokenizer = nltk.tokenize.treebank.TreebankWordDetokenizer()
 
 
-class Sentence(BaseModel, DataClassMixin):
-    tokens: List[SentenceToken] = []
-    formatting: bool = False
-    passthrough: int = 0
+class Sentence(DataClassMixin):
+    __slots__ = ('tokens', 'formatting', 'passthrough')
+    tokens: List[SentenceToken]
+    formatting: bool
+    passthrough: int
+
+    def __init__(
+        self,
+        *,
+        tokens: Optional[List[SentenceToken]] = None,
+        formatting: bool = False,
+        passthrough: int = 0
+    ):
+        self.tokens = [] if tokens is None else tokens
+        self.formatting = formatting
+        self.passthrough = passthrough
 
     def as_text(self):
         if self.formatting:
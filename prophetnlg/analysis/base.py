@@ -1,10 +1,28 @@
-from typing import Dict, Iterable, Iterator, List, Optional
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional
 import nltk
+from more_itertools import chunked
 from prophetnlg import Sentence, SentenceToken, WordAnalysis
+from prophetnlg.parallel import imap_ordered
+
+DEFAULT_CHUNK_SIZE = 16
+
+# analyzer of a pool worker process, created once by _init_worker
+_worker_analyzer: Optional['SentenceAnalyzerBase'] = None
+
+
+def _init_worker(analyzer_class: type, kwargs: Dict[str, Any]):
+    global _worker_analyzer
+    _worker_analyzer = analyzer_class(**kwargs)
+
+
+def _analyze_chunk(sentences: List[Sentence]) -> List[Sentence]:
+    return list(_worker_analyzer.analyze_sentences(sentences))
 
 
 class TokenizerBase:
-    def __init__(self, lang: str, language: str):
+    def __init__(self, lang: str, language: str, **kwargs):
         self.lang = lang
         self.language = language
 
@@ -18,9 +36,12 @@ class SentenceAnalyzerBase:
     tokenizer_class : type = TokenizerBase
 
     def __init__(self, **kwargs):
+        # kept for creating the same analyzer in worker processes
+        self.kwargs = kwargs
         self.lang = self.lang or kwargs.get('lang')
         self.language = self.language or kwargs.get('language')
-        self.tokenizer = self.tokenizer_class(lang=self.lang, language=self.language)
+        # tokenizers pick their own options (e.g. parser_url) from kwargs
+        self.tokenizer = self.tokenizer_class(**dict(kwargs, lang=self.lang, language=self.language))
 
     def get_weights(self, token: SentenceToken) -> Dict[str, float]:
         return {}
@@ -32,10 +53,52 @@ class SentenceAnalyzerBase:
         tokens = [self.analyze_token(token) for token in sentence.tokens]
         return sentence.replace(tokens=tokens)
 
-    def analyze_text(self, text: str) -> Iterator[Sentence]:
-        for sentence in self.tokenizer.tokenize(text):
+    def analyze_sentences(self, sentences: Iterable[Sentence]) -> Iterator[Sentence]:
+        for sentence in sentences:
             yield self.analyze_sentence(sentence)
 
+    def analyze_text(self, text: str) -> Iterator[Sentence]:
+        yield from self.analyze_sentences(self.tokenizer.tokenize(text))
+
+    def analyze_texts(
+        self,
+        texts: Iterable[str],
+        workers: int = 1,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Iterator[List[Sentence]]:
+        # sentences of each text in input order. Texts are tokenized here and
+        # chunks of chunk_size sentences, which may span texts, are analyzed
+        # in worker processes with at most 2 * workers chunks in flight, so
+        # a single long text is spread over the workers too.
+        if workers <= 1:
+            for text in texts:
+                yield list(self.analyze_text(text))
+            return
+
+        # sentence counts of the texts tokenized so far
+        counts: Deque[int] = deque()
+
+        def tokenize() -> Iterator[Sentence]:
+            for text in texts:
+                sentences = list(self.tokenizer.tokenize(text))
+                counts.append(len(sentences))
+                yield from sentences
+
+        with ProcessPoolExecutor(
+            workers, initializer=_init_worker, initargs=(type(self), self.kwargs)
+        ) as executor:
+            pending: List[Sentence] = []
+            chunks = chunked(tokenize(), chunk_size)
+            for results in imap_ordered(executor, _analyze_chunk, chunks, max_pending=2 * workers):
+                pending.extend(results)
+                while counts and len(pending) >= counts[0]:
+                    count = counts.popleft()
+                    yield pending[:count]
+                    del pending[:count]
+            # texts without sentences at the end
+            while counts:
+                yield pending[:counts.popleft()]
+
     def analyze_word(self, word: str) -> Optional[SentenceToken]:
         for sentence in self.analyze_text(word):
             for token in sentence.tokens:
@@ -1,12 +1,18 @@
 import difflib
 from typing import Iterable, Iterator, List, Optional, Tuple
+from more_itertools import chunked, split_at
 from prophetnlg import Sentence, SentenceToken, WordAnalysis
 from uralicNLP import cg3, dependency, uralicApi
 from uralicNLP.ud_tools import UD_node, UD_sentence
+from .cgpool import CGWorkerPool, DEFAULT_TIMEOUT
 from .nltk import SentenceAnalyzer
 
 Cg3Token = Tuple[str, List[cg3.Cg3Word]]
 
+# a CG delimiter that marks sentence boundaries in batched disambiguation
+SENTENCE_BOUNDARY = '¶'
+DEFAULT_BATCH_SIZE = 32
+
 
 def get_matched_indexes(a: List[str], b: List[str]) -> Iterator[Tuple[int, int]]:
     s = difflib.SequenceMatcher(None, a, b)
@@ -15,32 +21,73 @@ def get_matched_indexes(a: List[str], b: List[str]) -> Iterator[Tuple[int, int]]
             yield i1, i2
 
 
+def align_cg_tokens(cg_tokens: List[Cg3Token], words: List[str]) -> List[Cg3Token]:
+    # CG disambiguation may return tokens that are not part of original,
+    # so let's remove them!
+    if len(cg_tokens) > len(words):
+        new_tokens = []
+        for i1, i2 in get_matched_indexes([t[0] for t in cg_tokens], words):
+            new_tokens.extend(cg_tokens[i1:i2])
+        cg_tokens = new_tokens
+
+    assert len(cg_tokens) == len(words)
+    return cg_tokens
+
+
 class CGSentenceAnalyzer(SentenceAnalyzer):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.cg = cg3.Cg3(self.lang)
+        self.batch_size = kwargs.get('batch_size', DEFAULT_BATCH_SIZE)
+        self.pool = None
+        if kwargs.get('pool_size'):
+            self.pool = CGWorkerPool(
+                self.lang,
+                size=kwargs['pool_size'],
+                timeout=kwargs.get('pool_timeout', DEFAULT_TIMEOUT)
+            )
+
+    def _cg_disambiguate(self, words: List[str]) -> List[Cg3Token]:
+        if self.pool:
+            return self.pool.disambiguate(words)
+        return self.cg.disambiguate(words)
 
     def disambiguate(self, words: Iterable[str]) -> List[Cg3Token]:
         words = list(words)
-        cg_tokens = self.cg.disambiguate(words)
+        return align_cg_tokens(self._cg_disambiguate(words), words)
 
-        # CG disambiguation may return tokens that are not part of original,
-        # so let's remove them!
-        if len(cg_tokens) > len(words):
-            new_tokens = []
-            for i1, i2 in get_matched_indexes([t[0] for t in cg_tokens], words):
-                new_tokens.extend(cg_tokens[i1:i2])
-            cg_tokens = new_tokens
+    def disambiguate_sentences(self, sentences_words: Iterable[Iterable[str]]) -> List[List[Cg3Token]]:
+        sentences_words = [list(words) for words in sentences_words]
+        if any(SENTENCE_BOUNDARY in words for words in sentences_words):
+            return [self.disambiguate(words) for words in sentences_words]
 
-        assert len(cg_tokens) == len(words)
-        return cg_tokens
+        batch_words = []
+        for words in sentences_words:
+            batch_words.extend(words)
+            batch_words.append(SENTENCE_BOUNDARY)
+        cg_tokens = self._cg_disambiguate(batch_words)
+        cg_sentences = list(split_at(cg_tokens, lambda t: t[0] == SENTENCE_BOUNDARY))
 
-    def analyze_sentence(self, sentence: Sentence) -> Sentence:
-        disambiguated = self.disambiguate(t.text for t in sentence.tokens)
+        # the last boundary leaves an empty trailing part
+        if len(cg_sentences) != len(sentences_words) + 1:
+            return [self.disambiguate(words) for words in sentences_words]
+        return [align_cg_tokens(c, w) for c, w in zip(cg_sentences, sentences_words)]
+
+    def _analyze_disambiguated(self, sentence: Sentence, disambiguated: List[Cg3Token]) -> Sentence:
         tokens = [self.analyze_token(t, d) for t, d in zip(sentence.tokens, disambiguated)]
         return sentence.replace(tokens=tokens)
 
-    def _cg_token_morphologies(self, cg_token: Cg3Token = None) -> Iterator[str]:
+    def analyze_sentence(self, sentence: Sentence) -> Sentence:
+        disambiguated = self.disambiguate(t.text for t in sentence.tokens)
+        return self._analyze_disambiguated(sentence, disambiguated)
+
+    def analyze_sentences(self, sentences: Iterable[Sentence]) -> Iterator[Sentence]:
+        for batch in chunked(sentences, self.batch_size):
+            disambiguated = self.disambiguate_sentences([t.text for t in s.tokens] for s in batch)
+            for sentence, cg_tokens in zip(batch, disambiguated):
+                yield self._analyze_disambiguated(sentence, cg_tokens)
+
+    def cg_token_morphologies(self, cg_token: Cg3Token = None) -> Iterator[str]:
         if not cg_token:
             return
         text, cg_words = cg_token
@@ -51,5 +98,5 @@ class CGSentenceAnalyzer(SentenceAnalyzer):
             yield '+'.join(m for m in [lemma] + morphology_tags if '<' not in m)
 
     def analyze_token(self, token: SentenceToken, cg_token: Cg3Token = None, **kwargs) -> SentenceToken:
-        morphologies = list(self._cg_token_morphologies(cg_token))
+        morphologies = list(self.cg_token_morphologies(cg_token))
         return token.with_morphologies(morphologies, 'cg')
@@ -0,0 +1,184 @@
+import queue
+import subprocess
+import threading
+import time
+from typing import Iterable, List, Optional, Tuple
+from uralicNLP import cg3, uralicApi
+
+Cg3Token = Tuple[str, List[cg3.Cg3Word]]
+
+# vislcg3 processes all pending windows and echoes the command when it sees this
+FLUSH_COMMAND = '<STREAMCMD:FLUSH>'
+DEFAULT_TIMEOUT = 30.0
+
+
+class CGWorkerError(Exception):
+    pass
+
+
+def hfst_input(words: Iterable[str], lang: str) -> str:
+    # the HFST analyzer output that Cg3.disambiguate gives to cg-conv
+    lines = []
+    for word in words:
+        analyses = uralicApi.analyze(word, lang)
+        if not analyses:
+            lines.append(f'{word}\t{word}+?\tinf')
+        for analysis, weight in analyses:
+            lines.append(f'{word}\t{analysis}\t{weight}')
+        lines.append('')
+    return '\n'.join(lines)
+
+
+def cg_conv(hfst: str) -> str:
+    # the CG input that cg-conv -f makes of the HFST output, converted here
+    # instead of starting cg-conv for each call: a cohort per word and a
+    # reading per analysis, the lemma is the part before the first +
+    lines = []
+    word = None
+    for line in hfst.split('\n'):
+        parts = line.split('\t')
+        if len(parts) != 3:
+            word = None
+            continue
+        if parts[0] != word:
+            word = parts[0]
+            lines.append(f'"<{word}>"')
+        lemma, *tags = parts[1].split('+')
+        weight = float(parts[2])
+        lines.append('\t' + ' '.join([f'"{lemma}"'] + tags + [f'<W:{weight:f}>']))
+    return '\n'.join(lines) + '\n' if lines else ''
+
+
+def parse_cg_results(output: str) -> List[Cg3Token]:
+    # the parsing of Cg3.disambiguate, which is private there
+    results: List[Cg3Token] = []
+    current_word = None
+    current_list: List[cg3.Cg3Word] = []
+    for line in output.split('\n'):
+        if line.startswith('"<'):
+            if current_word is not None:
+                results.append((current_word, current_list))
+            current_word = line[2:-2]
+            current_list = []
+        elif line.startswith('\t'):
+            parts = line[2:].split('" ', 1)
+            if len(parts) < 2:
+                continue
+            current_list.append(cg3.Cg3Word(current_word, parts[0], parts[1].split(' ')))
+    return results
+
+
+class CGWorker:
+    def __init__(self, grammar_path: str, timeout: float = DEFAULT_TIMEOUT):
+        self.grammar_path = grammar_path
+        self.timeout = timeout
+        self.process: Optional[subprocess.Popen] = None
+        self.start()
+
+    def start(self):
+        self.process = subprocess.Popen(
+            ['vislcg3', '--grammar', self.grammar_path],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            encoding='utf-8',
+            bufsize=1,
+        )
+        # the input is written by a thread of its own, so that a process that
+        # stops reading makes run time out instead of blocking on a full pipe
+        self.inputs: queue.Queue = queue.Queue()
+        self.lines: queue.Queue = queue.Queue()
+        writer = threading.Thread(target=self._write, args=(self.process.stdin, self.inputs), daemon=True)
+        reader = threading.Thread(target=self._read, args=(self.process.stdout, self.lines), daemon=True)
+        writer.start()
+        reader.start()
+
+    @staticmethod
+    def _write(stream, inputs: queue.Queue):
+        for text in iter(inputs.get, None):
+            try:
+                stream.write(text)
+                stream.flush()
+            except (BrokenPipeError, OSError):
+                # the process has exited, the reader ends the stream
+                return
+
+    @staticmethod
+    def _read(stream, lines: queue.Queue):
+        for line in stream:
+            lines.put(line.rstrip('\n'))
+        # end of stream, the process has exited
+        lines.put(None)
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+        self.inputs.put(None)
+
+    def restart(self):
+        self.stop()
+        self.start()
+
+    def run(self, cg_input: str) -> str:
+        if self.process.poll() is not None:
+            raise CGWorkerError('CG3 worker is not running')
+        self.inputs.put(f'{cg_input}\n{FLUSH_COMMAND}\n')
+
+        deadline = time.monotonic() + self.timeout
+        output = []
+        while True:
+            try:
+                line = self.lines.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                raise CGWorkerError(f'CG3 worker timed out after {self.timeout} seconds')
+            if line is None:
+                raise CGWorkerError('CG3 worker exited')
+            if line.startswith(FLUSH_COMMAND):
+                return '\n'.join(output)
+            output.append(line)
+
+
+class CGWorkerPool:
+    def __init__(
+        self,
+        lang: str,
+        size: int = 1,
+        timeout: float = DEFAULT_TIMEOUT,
+        retries: int = 1,
+        grammar_path: Optional[str] = None
+    ):
+        self.lang = lang
+        self.grammar_path = grammar_path or cg3.Cg3(lang).cg_path
+        self.retries = retries
+        self.workers: queue.Queue = queue.Queue()
+        for i in range(size):
+            self.workers.put(CGWorker(self.grammar_path, timeout))
+
+    def _run(self, cg_input: str) -> str:
+        worker = self.workers.get()
+        attempt = 0
+        try:
+            while True:
+                try:
+                    return worker.run(cg_input)
+                except CGWorkerError:
+                    # crashed or hanging worker, replace the process
+                    worker.restart()
+                    attempt += 1
+                    if attempt > self.retries:
+                        raise
+        finally:
+            self.workers.put(worker)
+
+    def disambiguate_hfst(self, hfst: str) -> List[Cg3Token]:
+        return parse_cg_results(self._run(cg_conv(hfst)))
+
+    def disambiguate(self, words: List[str]) -> List[Cg3Token]:
+        # like Cg3.disambiguate, end with an empty word, as the result
+        # parser drops the last cohort
+        return self.disambiguate_hfst(hfst_input(words + [''], self.lang))
+
+    def close(self):
+        while not self.workers.empty():
+            self.workers.get_nowait().stop()
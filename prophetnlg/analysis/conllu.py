@@ -0,0 +1,95 @@
+import io
+import mmap
+from pathlib import Path
+from typing import IO, Iterable, Iterator, List, Optional, TextIO, Union
+from prophetnlg import Sentence, SentenceToken, parse_morphology
+from .ud import ud_sentence_from_tokens, ud_token
+
+Source = Union[str, Path, IO]
+
+
+def _mmap_lines(path: Union[str, Path]) -> Iterator[str]:
+    with open(path, 'rb') as f:
+        if not f.seek(0, io.SEEK_END):
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            for line in iter(buffer.readline, b''):
+                yield line.decode('utf-8')
+
+
+def _file_lines(source: Source, use_mmap: bool) -> Iterator[str]:
+    if isinstance(source, (str, Path)):
+        if use_mmap:
+            yield from _mmap_lines(source)
+        else:
+            with open(source, encoding='utf-8') as f:
+                yield from f
+        return
+    for line in source:
+        yield line.decode('utf-8') if isinstance(line, bytes) else line
+
+
+def read_conllu_rows(lines: Iterable[str]) -> Iterator[List[List[str]]]:
+    # word lines of each sentence split to columns, comments, multiword
+    # ranges (1-2) and empty nodes (1.1) skipped like UD_sentence does
+    rows: List[List[str]] = []
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if not line:
+            if rows:
+                yield rows
+                rows = []
+            continue
+        if line.startswith('#'):
+            continue
+        columns = line.split('\t')
+        if '-' in columns[0] or '.' in columns[0]:
+            continue
+        rows.append(columns)
+    if rows:
+        yield rows
+
+
+def read_conllu(source: Source, lang: str = 'fin', use_mmap: bool = False) -> Iterator[Sentence]:
+    # lazily reads sentences as UDTokenizer makes them from parser output,
+    # without keeping the UD_node objects
+    for rows in read_conllu_rows(_file_lines(source, use_mmap)):
+        tokens = [ud_token(c[1], c[2], c[3], c[5], c[9], lang) for c in rows]
+        yield ud_sentence_from_tokens(tokens)
+
+
+def _misc(token: SentenceToken) -> str:
+    if token.spaces_after == ' ':
+        return '_'
+    if token.spaces_after == '':
+        return 'SpaceAfter=No'
+    spaces_after = token.spaces_after.replace(' ', '\\s').replace('\n', '\\n')
+    return f'SpacesAfter={spaces_after}'
+
+
+def conllu_lines(sentence: Sentence, sent_id: Optional[int] = None, analysis_type: str = 'guess') -> Iterator[str]:
+    # the chosen morphology goes to LEMMA and XPOS (e.g. N+Sg+Nom), there
+    # are no UD tags or dependencies
+    if sent_id is not None:
+        yield f'# sent_id = {sent_id}\n'
+    # comments are one line, only SpacesAfter keeps the newlines (escaped)
+    text = ''.join(f'{t.text}{t.spaces_after}' for t in sentence.tokens).strip()
+    text = text.replace('\r', ' ').replace('\n', ' ')
+    yield f'# text = {text}\n'
+    for i, token in enumerate(sentence.tokens, 1):
+        analysis = token.analyses.get(analysis_type)
+        morphology = analysis.morphology if analysis else ''
+        lemma, xpos = '_', '_'
+        if morphology:
+            parsed = parse_morphology(morphology)
+            lemma = parsed.lemma or '_'
+            xpos = '+'.join((parsed.pos,) + parsed.tags) if parsed.pos else '_'
+        yield f'{i}\t{token.text}\t{lemma}\t_\t{xpos}\t_\t_\t_\t_\t{_misc(token)}\n'
+    yield '\n'
+
+
+def write_conllu(sentences: Iterable[Sentence], f: TextIO, analysis_type: str = 'guess') -> int:
+    count = 0
+    for count, sentence in enumerate(sentences, 1):
+        f.writelines(conllu_lines(sentence, count, analysis_type))
+    return count
@@ -1,6 +1,6 @@
 from itertools import chain
-from typing import Dict, List, Set
-from prophetnlg import Sentence, SentenceToken
+from typing import Any, Dict, FrozenSet, Hashable, Iterable, Iterator, List, Set, Tuple
+from prophetnlg import Sentence, SentenceToken, WordAnalysis
 from prophetnlg.datasets.semfi import SemFi
 from .cg import CGSentenceAnalyzer
 from .frequency import FrequencySentenceAnalyzerBase
@@ -25,10 +25,32 @@ class FinHeuristicMixin(FinMixin):
             return token.analyses['semfi'].get_morphologies()
         return {}
 
+    def add_fused_analyses(
+        self,
+        token: SentenceToken,
+        type_memo: Dict[Hashable, Any]
+    ) -> Dict[str, WordAnalysis]:
+        analyses = super().add_fused_analyses(token, type_memo)
+        # as FinFrequencyAnalyzer.analyze_token, after the guess
+        lemmas_pos = self.frequency_analyzer.get_analyses_lemmas_pos(chain(token.analyses.values(), analyses.values()))
+        weights = type_memo.get(('semfi', lemmas_pos))
+        if weights is None:
+            weights = type_memo[('semfi', lemmas_pos)] = self.frequency_analyzer.get_frequencies(lemmas_pos)
+        analyses[self.frequency_analyzer.analysis_type] = WordAnalysis(text=token.text, morphologies=weights)
+        return analyses
+
     def analyze_sentence(self, sentence: Sentence) -> Sentence:
         sentence = super().analyze_sentence(sentence)
+        if self.fused:
+            return sentence
         return self.frequency_analyzer.analyze_sentence(sentence)
 
+    def analyze_sentences(self, sentences: Iterable[Sentence]) -> Iterator[Sentence]:
+        sentences = super().analyze_sentences(sentences)
+        if self.fused:
+            return sentences
+        return self.frequency_analyzer.analyze_sentences(sentences)
+
     def get_morphologies_by_sources(self, token: SentenceToken) -> List[Set[str]]:
         morphologies = super().get_morphologies_by_sources(token)
         if 'semfi' in token.analyses:
@@ -67,9 +89,17 @@ class FinFrequencyAnalyzer(FinMixin, FrequencySentenceAnalyzerBase):
         super().__init__(**kwargs)
         self.semfi = SemFi()
 
-    def get_weights(self, token: SentenceToken) -> Dict[str, float]:
-        morphologies = chain(*(t.get_morphologies() for t in token.analyses.values()))
-        lemmas_pos = {tuple(m.split('+', 2)[:2]) for m in morphologies}
+    def get_lemmas_pos(self, token: SentenceToken) -> FrozenSet[Tuple[str, ...]]:
+        return self.get_analyses_lemmas_pos(token.analyses.values())
+
+    def get_analyses_lemmas_pos(self, analyses: Iterable[WordAnalysis]) -> FrozenSet[Tuple[str, ...]]:
+        morphologies = chain(*(a.get_morphologies() for a in analyses))
+        return frozenset(tuple(m.split('+', 2)[:2]) for m in morphologies)
+
+    def get_frequencies(self, lemmas_pos: FrozenSet[Tuple[str, ...]]) -> Dict[str, float]:
         if not len(lemmas_pos):
             return {}
         return self.semfi.get_frequencies(lemmas_pos)
+
+    def get_weights(self, token: SentenceToken) -> Dict[str, float]:
+        return self.get_frequencies(self.get_lemmas_pos(token))
@@ -1,6 +1,8 @@
-from typing import Callable, Dict, Iterable, List, Sequence, Set, Tuple, Union
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Sequence, Set, Tuple, Union
+from more_itertools import chunked
 from prophetnlg import Sentence, SentenceToken, WordAnalysis
-from .cg import CGSentenceAnalyzer
+from prophetnlg.cache.lru import LRUCache
+from .cg import CGSentenceAnalyzer, Cg3Token
 from .nltk import SentenceAnalyzer
 from .ud import UDSentenceAnalyzer
 from .uralic import UralicSentenceAnalyzer
@@ -13,11 +15,21 @@ WordFitFunction = Callable[
     # these tuples are ultimately sorted and largest of them will be the "guess"
 ]
 
+DEFAULT_MORPHOLOGY_CACHE_SIZE = 100000
+
 class HeuristicMixin:
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.cg_analyzer = CGSentenceAnalyzer(lang=self.lang, language=self.language)
-        self.uralic_analyzer = UralicSentenceAnalyzer(lang=self.lang, language=self.language)
+        # sub-analyzers pick their own options (e.g. cache_size) from kwargs
+        kwargs = dict(kwargs, lang=self.lang, language=self.language)
+        self.cg_analyzer = CGSentenceAnalyzer(**kwargs)
+        self.uralic_analyzer = UralicSentenceAnalyzer(**kwargs)
+        # chosen morphologies by (text, candidates per source, relevant weights)
+        self.morphology_cache = LRUCache(
+            maxsize=kwargs.get('morphology_cache_size', DEFAULT_MORPHOLOGY_CACHE_SIZE)
+        )
+        # fused analysis builds each token once instead of once per pass
+        self.fused = kwargs.get('fused', True)
 
     def pick_morphology(self, token: SentenceToken, *sources: Iterable[str]) -> str:
         all_morphologies : List[str] = list(set().union(*sources))
@@ -49,22 +61,95 @@ class HeuristicMixin:
             weights.get(m_i_p[2][0], 0.0),
         )
 
-    def get_morphology(self, token: SentenceToken) -> str:
-        morphologies = self.get_morphologies_by_sources(token)
+    def _relevant_weights(self, morphologies: List[Set[str]], weights: Dict[str, float]) -> Tuple:
+        # the fit function only looks up weights by the first parts
+        if not weights:
+            return ()
+        parts = {m.split()[0] for s in morphologies for m in s}
+        return tuple(sorted((p, weights[p]) for p in parts if p in weights))
+
+    def _get_morphology(self, token: SentenceToken, morphologies: List[Set[str]]) -> str:
         common = set.intersection(*morphologies)
         if len(common) == 1:
             return common.pop()
         return self.pick_morphology(token, common, *morphologies)
 
+    def get_morphology(self, token: SentenceToken) -> str:
+        morphologies = self.get_morphologies_by_sources(token)
+        key = (
+            token.text,
+            tuple(frozenset(s) for s in morphologies),
+            self._relevant_weights(morphologies, self.get_weights(token)),
+        )
+        return self.morphology_cache.get_or_set(key, lambda: self._get_morphology(token, morphologies))
+
     def analyze_token(self, token: SentenceToken, **kwargs) -> SentenceToken:
         morphology = self.get_morphology(token)
         return token.with_morphologies([morphology], 'guess')
 
+    def add_fused_analyses(
+        self,
+        token: SentenceToken,
+        type_memo: Dict[Hashable, Any]
+    ) -> Dict[str, WordAnalysis]:
+        # analyses to add to token, which has the cg and uralic ones
+        morphology = self.get_morphology(token)
+        return {'guess': WordAnalysis(text=token.text, morphologies={morphology: 0.0})}
+
+    def analyze_token_fused(
+        self,
+        token: SentenceToken,
+        cg_token: Cg3Token,
+        type_memo: Dict[Hashable, Any]
+    ) -> SentenceToken:
+        # same analyses as the cg, uralic and guess passes, context
+        # independent ones are shared by the tokens of a word form
+        text = token.text
+        cg_morphologies = self.cg_analyzer.cg_token_morphologies(cg_token)
+        u_analysis = type_memo.get(('uralic', text))
+        if u_analysis is None:
+            u_analysis = type_memo[('uralic', text)] = self.uralic_analyzer.analyze_type(text)
+        token = token.replace(analyses={
+            **token.analyses,
+            'cg': WordAnalysis(text=text, morphologies=dict.fromkeys(cg_morphologies, 0.0)),
+            'uralic': u_analysis,
+        })
+        analyses = self.add_fused_analyses(token, type_memo)
+        return token.replace(analyses={**token.analyses, **analyses})
+
+    def _analyze_fused(
+        self,
+        sentence: Sentence,
+        disambiguated: List[Cg3Token],
+        type_memo: Dict[Hashable, Any]
+    ) -> Sentence:
+        tokens = [
+            self.analyze_token_fused(t, d, type_memo)
+            for t, d in zip(sentence.tokens, disambiguated)
+        ]
+        return sentence.replace(tokens=tokens)
+
     def analyze_sentence(self, sentence: Sentence) -> Sentence:
+        if self.fused:
+            disambiguated = self.cg_analyzer.disambiguate(t.text for t in sentence.tokens)
+            return self._analyze_fused(sentence, disambiguated, {})
         sentence = self.cg_analyzer.analyze_sentence(sentence)
         sentence = self.uralic_analyzer.analyze_sentence(sentence)
         return super().analyze_sentence(sentence)
 
+    def analyze_sentences(self, sentences: Iterable[Sentence]) -> Iterator[Sentence]:
+        if self.fused:
+            for batch in chunked(sentences, self.cg_analyzer.batch_size):
+                words = ([t.text for t in s.tokens] for s in batch)
+                type_memo: Dict[Hashable, Any] = {}
+                for sentence, cg_tokens in zip(batch, self.cg_analyzer.disambiguate_sentences(words)):
+                    yield self._analyze_fused(sentence, cg_tokens, type_memo)
+            return
+        sentences = self.cg_analyzer.analyze_sentences(sentences)
+        sentences = self.uralic_analyzer.analyze_sentences(sentences)
+        for sentence in sentences:
+            yield super().analyze_sentence(sentence)
+
 
 class HeuristicSentenceAnalyzer(HeuristicMixin, SentenceAnalyzer):
     def get_morphologies_by_sources(self, token: SentenceToken) -> List[Set[str]]:
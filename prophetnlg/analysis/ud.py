@@ -1,44 +1,144 @@
-from typing import Iterator, List, Set
+from typing import Iterable, Iterator, List, Optional, Set
+import requests
 from uralicNLP import dependency, uralicApi
-from uralicNLP.ud_tools import UD_node, UD_sentence
+from uralicNLP.ud_tools import UD_collection, UD_node, UD_sentence
 from prophetnlg import Sentence, SentenceToken, WordAnalysis
+from prophetnlg.cache.disk import DEFAULT_MAX_SIZE, TextDiskCache
 from .base import SentenceAnalyzerBase, TokenizerBase
-from .udparse import ud_node_morphology
+from .udclient import (
+    DEFAULT_CONCURRENCY, DEFAULT_RETRIES, DEFAULT_TIMEOUT, DEFAULT_URL, UDParseClient
+)
+from .udparse import ud_morphology
+
+# model of the parser server started by services.sh
+DEFAULT_PARSER_MODEL = 'fi_tdt'
+
+
+def ud_token(
+    form: str,
+    lemma: str,
+    pos: str,
+    feats: str,
+    misc: str,
+    lang: str,
+    original: Optional[UD_node] = None
+) -> SentenceToken:
+    misc_items = dict(f.split('=', 1) for f in misc.split('|') if '=' in f)
+    spaces_after = ' '
+    if misc_items.get('SpaceAfter') == 'No':
+        spaces_after = ''
+    if misc_items.get('SpacesAfter'):
+        spaces_after = misc_items['SpacesAfter']
+
+    spaces_after = spaces_after.replace('\\s', ' ').replace('\\n', '\n')
+
+    token = SentenceToken(
+        text=form,
+        lang='?' if 'Foreign=Yes' in feats.split('|') else lang,
+        spaces_after=spaces_after
+    )
+    m = ud_morphology(lemma, pos, feats, misc)
+    analysis = WordAnalysis(text=form, original=original, morphologies={m: 0.0})
+    return token.with_analysis(analysis, 'ud')
+
+
+def ud_sentence_from_tokens(tokens: List[SentenceToken]) -> Sentence:
+    if tokens:
+        # single whitespace after last token
+        tokens[-1] = tokens[-1].replace(spaces_after=' ')
+    return Sentence(tokens=tokens, formatting=True)
 
 
 class UDTokenizer(TokenizerBase):
+    def __init__(self, lang: str, language: str, **kwargs):
+        super().__init__(lang, language)
+        self.parser_url = kwargs.get('parser_url', DEFAULT_URL)
+        self.client = UDParseClient(
+            self.parser_url,
+            concurrency=kwargs.get('parser_concurrency', DEFAULT_CONCURRENCY),
+            batch_size=kwargs.get('parser_batch_size', 1),
+            timeout=kwargs.get('parser_timeout', DEFAULT_TIMEOUT),
+            retries=kwargs.get('parser_retries', DEFAULT_RETRIES)
+        )
+        # raw CoNLL-U output is cached by (parser model, text) when cache_dir is set
+        self.parser_model = kwargs.get('parser_model', DEFAULT_PARSER_MODEL)
+        self.cache: Optional[TextDiskCache] = None
+        if kwargs.get('cache_dir'):
+            self.cache = TextDiskCache(
+                kwargs['cache_dir'],
+                max_size=kwargs.get('cache_dir_size', DEFAULT_MAX_SIZE),
+                suffix='.conllu'
+            )
+
     def _parse_ud_node(self, node: UD_node) -> SentenceToken:
-        misc = dict(f.split('=', 1) for f in node.misc.split('|') if '=' in f)
-        spaces_after = ' '
-        if misc.get('SpaceAfter') == 'No':
-            spaces_after = ''
-        if misc.get('SpacesAfter'):
-            spaces_after = misc['SpacesAfter']
-
-        spaces_after = spaces_after.replace('\\s', ' ').replace('\\n', '\n')
-
-        token = SentenceToken(
-            text=node.form,
-            lang='?' if 'Foreign=Yes' in node.get_feats() else self.lang,
-            spaces_after=spaces_after
+        return ud_token(
+            node.form, node.lemma, node.pos, node.feats, node.misc, self.lang, original=node
         )
-        m = ud_node_morphology(node)
-        analysis = WordAnalysis(text=node.form, original=node, morphologies={m: 0.0})
-        return token.with_analysis(analysis, 'ud')
 
     def _parse_ud_sentence(self, ud_sentence: UD_sentence) -> Sentence:
-        tokens = [self._parse_ud_node(node) for node in ud_sentence]
-        if tokens:
-            # single whitespace after last token
-            tokens[-1] = tokens[-1].replace(spaces_after=' ')
-        return Sentence(tokens=tokens, formatting=True)
+        return ud_sentence_from_tokens([self._parse_ud_node(node) for node in ud_sentence])
+
+    def _cache_key(self, text: str) -> str:
+        return TextDiskCache.make_key(self.parser_model, text)
+
+    def _get_cached(self, text: str) -> Optional[str]:
+        return self.cache.get(self._cache_key(text)) if self.cache is not None else None
+
+    def _set_cached(self, text: str, conllu: str):
+        if self.cache is not None:
+            self.cache[self._cache_key(text)] = conllu
+
+    def _parse(self, text: str) -> str:
+        # same request as dependency.parse_text, but keeps the raw output
+        if self.lang != 'fin':
+            raise dependency.LanguageNotSupported('Language is not supported')
+        r = requests.post(
+            self.parser_url,
+            data=text.encode('utf-8'),
+            headers={'content-type': 'text/plain; charset=utf8'}
+        )
+        if r.status_code != 200:
+            raise dependency.BackendNotOnline(
+                f'Parser at {self.parser_url} returned status {r.status_code}'
+            )
+        return r.text
+
+    def _parse_conllu(self, conllu: str) -> List[Sentence]:
+        return [self._parse_ud_sentence(s) for s in UD_collection(conllu.split('\n'))]
 
     def tokenize(self, text: str) -> Iterator[Sentence]:
         if not text:
             return
-        for ud_sentence in dependency.parse_text(text, language=self.lang):
-            yield self._parse_ud_sentence(ud_sentence)
+        conllu = self._get_cached(text)
+        if conllu is None:
+            conllu = self._parse(text)
+            self._set_cached(text, conllu)
+        yield from self._parse_conllu(conllu)
+
+    async def tokenize_async(self, text: str) -> List[Sentence]:
+        return (await self.tokenize_many_async([text]))[0]
+
+    async def tokenize_many_async(self, texts: Iterable[str]) -> List[List[Sentence]]:
+        texts = list(texts)
+        conllus = [self._get_cached(text) if text else '' for text in texts]
+        missing = [i for i, conllu in enumerate(conllus) if conllu is None]
+        parsed = await self.client.parse_many([texts[i] for i in missing])
+        for i, conllu in zip(missing, parsed):
+            conllus[i] = conllu
+            self._set_cached(texts[i], conllu)
+        return [self._parse_conllu(conllu) for conllu in conllus]
 
 
 class UDSentenceAnalyzer(SentenceAnalyzerBase):
     tokenizer_class = UDTokenizer
+    tokenizer: UDTokenizer
+
+    # parsing runs concurrently against the parser server, the analysis of
+    # the parsed sentences in the calling thread
+    async def analyze_text_async(self, text: str) -> List[Sentence]:
+        sentences = await self.tokenizer.tokenize_async(text)
+        return list(self.analyze_sentences(sentences))
+
+    async def analyze_texts_async(self, texts: Iterable[str]) -> List[List[Sentence]]:
+        results = await self.tokenizer.tokenize_many_async(texts)
+        return [list(self.analyze_sentences(sentences)) for sentences in results]
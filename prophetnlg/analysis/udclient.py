@@ -0,0 +1,185 @@
+import asyncio
+import logging
+from typing import List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_URL = 'http://localhost:9876'
+DEFAULT_CONCURRENCY = 4
+DEFAULT_TIMEOUT = 60.0
+DEFAULT_RETRIES = 2
+# texts of a batch are separated by a paragraph with only this token, the
+# parser returns it as a sentence of its own
+TEXT_BOUNDARY = '¶'
+
+
+class UDParseError(Exception):
+    pass
+
+
+class HTTPConnection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    async def _read_chunked(self) -> bytes:
+        chunks = []
+        while True:
+            size = int((await self.reader.readline()).split(b';', 1)[0], 16)
+            if not size:
+                await self.reader.readline()
+                return b''.join(chunks)
+            chunks.append(await self.reader.readexactly(size))
+            await self.reader.readline()
+
+    async def post(self, host: str, path: str, body: bytes) -> Tuple[int, bytes, bool]:
+        # returns status, response body and whether the connection can be reused
+        self.writer.write(
+            f'POST {path} HTTP/1.1\r\n'
+            f'Host: {host}\r\n'
+            'Content-Type: text/plain; charset=utf8\r\n'
+            f'Content-Length: {len(body)}\r\n'
+            'Connection: keep-alive\r\n'
+            '\r\n'.encode('latin-1') + body
+        )
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError('connection closed by the parser')
+        version, status = status_line.decode('latin-1').split(None, 2)[:2]
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            key, _, value = line.decode('latin-1').partition(':')
+            headers[key.strip().lower()] = value.strip().lower()
+
+        keep_alive = headers.get('connection', 'keep-alive' if version == 'HTTP/1.1' else 'close') != 'close'
+        if 'content-length' in headers:
+            data = await self.reader.readexactly(int(headers['content-length']))
+        elif headers.get('transfer-encoding') == 'chunked':
+            data = await self._read_chunked()
+        else:
+            data = await self.reader.read()
+            keep_alive = False
+        return int(status), data, keep_alive
+
+    def close(self):
+        self.writer.close()
+
+
+class UDParseClient:
+    # Asyncio client for the Turku neural parser server started by
+    # services.sh. At most `concurrency` requests are in flight, each on a
+    # pooled keep-alive connection, and parse_many sends batch_size texts
+    # per request.
+    def __init__(
+        self,
+        url: str = DEFAULT_URL,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        batch_size: int = 1,
+        timeout: float = DEFAULT_TIMEOUT,
+        retries: int = DEFAULT_RETRIES
+    ):
+        parts = urlsplit(url)
+        self.host = parts.hostname or 'localhost'
+        self.port = parts.port or 80
+        self.path = parts.path or '/'
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.retries = retries
+        # connections and the semaphore belong to the loop they were made in
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._idle: List[HTTPConnection] = []
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _check_loop(self):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._idle = []
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def _post(self, text: str) -> str:
+        if self._idle:
+            connection = self._idle.pop()
+        else:
+            connection = HTTPConnection(*await asyncio.open_connection(self.host, self.port))
+        reusable = False
+        try:
+            status, data, reusable = await connection.post(
+                f'{self.host}:{self.port}', self.path, text.encode('utf-8')
+            )
+        finally:
+            if reusable:
+                self._idle.append(connection)
+            else:
+                connection.close()
+        if status != 200:
+            raise UDParseError(f'parser at {self.host}:{self.port} returned status {status}')
+        return data.decode('utf-8')
+
+    async def parse(self, text: str) -> str:
+        # CoNLL-U output of the parser for text
+        self._check_loop()
+        attempt = 0
+        async with self._semaphore:
+            while True:
+                try:
+                    return await asyncio.wait_for(self._post(text), self.timeout)
+                except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, UDParseError) as e:
+                    if attempt >= self.retries:
+                        raise
+                    attempt += 1
+                    logger.warning('UD parse failed (%s), retrying', e)
+
+    async def _parse_batch(self, texts: Sequence[str]) -> List[str]:
+        if len(texts) == 1:
+            return [await self.parse(texts[0])]
+        conllu = await self.parse(f'\n\n{TEXT_BOUNDARY}\n\n'.join(texts))
+        results = split_conllu(conllu)
+        if len(results) != len(texts):
+            # the boundary was merged into a sentence, parse separately
+            return list(await asyncio.gather(*(self.parse(t) for t in texts)))
+        return results
+
+    async def parse_many(self, texts: Sequence[str]) -> List[str]:
+        # CoNLL-U output for each text, in order
+        results = [''] * len(texts)
+        indexes = [i for i, text in enumerate(texts) if text]
+        batches = [indexes[i:i + self.batch_size] for i in range(0, len(indexes), self.batch_size)]
+        outputs = await asyncio.gather(*(self._parse_batch([texts[i] for i in b]) for b in batches))
+        for batch, output in zip(batches, outputs):
+            for i, conllu in zip(batch, output):
+                results[i] = conllu
+        return results
+
+    def close(self):
+        for connection in self._idle:
+            connection.close()
+        self._idle = []
+
+
+def _is_boundary(block: List[str]) -> bool:
+    words = [line.split('\t') for line in block if line and not line.startswith('#')]
+    return len(words) == 1 and len(words[0]) > 1 and words[0][1] == TEXT_BOUNDARY
+
+
+def split_conllu(conllu: str) -> List[str]:
+    # splits batched output at the boundary sentences
+    results: List[List[str]] = [[]]
+    block: List[str] = []
+    for line in conllu.split('\n') + ['']:
+        if line.strip():
+            block.append(line)
+            continue
+        if _is_boundary(block):
+            results.append([])
+        elif block:
+            results[-1].append('\n'.join(block) + '\n')
+        block = []
+    return ['\n'.join(blocks) for blocks in results]
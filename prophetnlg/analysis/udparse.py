@@ -1,5 +1,6 @@
+from functools import lru_cache
 import logging
-from typing import Dict, List
+from typing import Callable, Dict, List, Tuple
 from uralicNLP.ud_tools import UD_node
 
 logger = logging.getLogger(__name__)
@@ -57,14 +58,173 @@ tags = [
 tag_indexes = {tag: idx for idx, tag in enumerate(tags)}
 
 
+# (feature, value) -> tags, features with a rule in FEAT_VALUE_RULES
+# fall back to it for other values
+FEAT_TAGS: Dict[Tuple[str, str], Tuple[str, ...]] = {
+    ('Number', 'Sing'): ('Sg',),
+    ('Number', 'Plur'): ('Pl',),
+    ('Tense', 'Pres'): ('Prs',),
+    ('Tense', 'Past'): ('Prt',),
+    ('Mood', 'Ind'): (),
+    ('Mood', 'Cnd'): ('Cond',),
+    ('Mood', 'Impv'): ('Imp',),
+    ('Person', '0'): ('__3',),
+    ('Person', '1'): ('__1',),
+    ('Person', '2'): ('__2',),
+    ('Person', '3'): ('__3',),
+    ('Person', '4'): ('Pe4',),
+    ('Number[psor]', 'Sing'): ('PxSg_',),
+    ('Number[psor]', 'Plur'): ('PxPl_',),
+    ('Person[psor]', '1'): ('Px__1',),
+    ('Person[psor]', '2'): ('Px__2',),
+    ('Person[psor]', '3'): ('PxSp3',),
+    ('Polarity', 'Neg'): ('Neg',),
+    ('Connegative', 'Yes'): ('Act', 'ConNeg'),
+    ('InfForm', '1'): ('Inf1', 'Lat'),
+    ('InfForm', '2'): ('Inf2',),
+    ('InfForm', '3'): ('Inf3',),
+    ('InfForm', 'MINEN'): ('Inf4',),
+    ('InfForm', 'MAISILLA'): ('Inf5',),
+    ('SUBCAT', 'NEG'): ('Neg',),
+    ('SUBCAT', 'QUOTATION'): ('Quote',),
+    ('SUBCAT', 'QUANTIFIER'): ('Qnt',),
+    ('SUBCAT', 'DIGIT'): ('Digit',),
+    # not annotated in FTN feats: punctuation classes, decimal, roman NumType
+    **{('SUBCAT', v): () for v in ['COMMA', 'BRACKET', 'ARROW', 'DECIMAL', 'PREFIX', 'SUFFIX', 'ROMAN']},
+    ('NumType', 'Ord'): ('Ord',),
+    ('PronType', 'Prs'): ('Pers',),
+    ('PronType', 'Ind'): ('Qnt',),
+    ('PronType', 'Int'): ('Interr',),
+    ('AdpType', 'Post'): ('Po',),
+    ('AdpType', 'Prep'): ('Pr',),
+    ('Clitic', 'Ka'): ('Foc_kA',),
+    ('Derivation', 'NUT'): ('Act',),
+    ('Derivation', 'VA'): ('Act',),
+    ('Derivation', 'TU'): ('Pss',),
+    ('Derivation', 'TAVA'): ('Pss',),
+}
+
+FEAT_VALUE_RULES: Dict[str, Callable[[str], Tuple[str, ...]]] = {
+    'Number': lambda v: (),
+    'Tense': lambda v: (),
+    'Mood': lambda v: (v,),
+    'Voice': lambda v: (v,),
+    'InfForm': lambda v: (),
+    # FTB participle is POS
+    'PartForm': lambda v: (),
+    'Case': lambda v: (v,),
+    'Degree': lambda v: (v,),
+    'NumType': lambda v: (),
+    'PronType': lambda v: (v,),
+    'Clitic': lambda v: ('Foc_' + v,),
+    'Abbr': lambda v: ('Abbr',),
+    'Derivation': lambda v: (),
+    'Reflex': lambda v: ('Refl',),
+    **{k: (lambda v: ()) for k in [
+        'UPOS', 'ALLO', 'WEIGHT', 'CASECHANGE', 'NEWPARA',
+        'GUESS', 'PROPER', 'SEM', 'CONJ', 'BOUNDARY',
+        'PCP', 'DRV', 'LEX', 'BLACKLIST', 'Style',
+        'POSITION', "Foreign", 'VerbForm',
+        'Typo'
+    ]},
+}
+
+FEAT_WARNINGS = {
+    'Person': 'for ftb', 'Number[psor]': 'for ftb', 'Person[psor]': 'for ftb',
+    'Polarity': 'for ftb', 'Connegative': 'for ftb', 'SUBCAT': 'SUBCAT',
+}
+
+
+def _feat_tags(key: str, value: str) -> Tuple[str, ...]:
+    tags = FEAT_TAGS.get((key, value))
+    if tags is not None:
+        return tags
+    rule = FEAT_VALUE_RULES.get(key)
+    if rule:
+        return rule(value)
+    if key in FEAT_WARNINGS:
+        logger.warning(key, value, FEAT_WARNINGS[key])
+    elif key == 'AdpType':
+        logger.warning(key, value, 'ADPTYPE', 'FTB3')
+    else:
+        logger.warning(key, value, 'FTB3')
+    return ()
+
+
+# only these MISC keys affect the tags, the rest are ignored
+MISC_KEYS = frozenset(['NumType', 'Person', 'PunctType', 'PropnType', 'Derivation', 'Mood'])
+
+MISC_TAGS: Dict[Tuple[str, str], Tuple[str, ...]] = {
+    ('Person', '4'): ('Pe4',),
+    ('PunctType', 'Quotation'): ('Quote',),
+    ('PunctType', 'Comma'): (),
+    ('PunctType', 'Bracket'): (),
+    ('PunctType', 'Arrow'): (),
+    ('Derivation', 'Tava'): ('Pass',),
+    ('Derivation', 'Tu'): ('Pass',),
+    ('Derivation', 'Va'): ('Act',),
+    ('Derivation', 'Nut'): ('Act',),
+    ('Mood', 'Opt'): ('Opt',),
+}
+
+DASH_TAGS = {'—': ('EmDash',), '–': ('EnDash',)}
+
+
+def _misc_tags(key: str, value: str, lemma: str) -> Tuple[str, ...]:
+    tags = MISC_TAGS.get((key, value))
+    if tags is not None:
+        return tags
+    if key == 'NumType':
+        return (value,)
+    if key == 'PropnType':
+        return ('Prop',)
+    if key == 'PunctType':
+        if value == 'Dash':
+            return DASH_TAGS.get(lemma, ('Dash',))
+        logger.warning(key, value, 'FTB3')
+    return ()
+
+
+@lru_cache(maxsize=4096)
+def _misc_key(misc_string: str) -> Tuple[Tuple[str, str], ...]:
+    misc = dict(f.split('=', 1) for f in misc_string.split('|') if '=' in f)
+    return tuple((k, v) for k, v in misc.items() if k in MISC_KEYS)
+
+
+# the tags depend on the lemma only through these classes
+SPECIAL_LEMMAS = frozenset(['ei', '—', '–'])
+
+
+def _lemma_class(lemma: str) -> str:
+    if lemma in SPECIAL_LEMMAS:
+        return lemma
+    return 'sti' if lemma.endswith('sti') else ''
+
+
+def morphology_parts(lemma: str, pos: str, feats_string: str, misc_string: str) -> List[str]:
+    return list(_morphology_parts(pos, feats_string, _misc_key(misc_string), _lemma_class(lemma)))
+
+
+# the distinct (pos, feats, misc) bundles of a corpus are few
+@lru_cache(maxsize=65536)
+def _morphology_parts(
+    pos: str,
+    feats_string: str,
+    misc_key: Tuple[Tuple[str, str], ...],
+    lemma: str
+) -> Tuple[str, ...]:
+    return tuple(_compute_morphology_parts(lemma, pos, feats_string, misc_key))
+
+
 # NOTE: taken originally from Omorfi `get_ftb_feats`
 # modified to not exit on error, plus changed the logic to
 # have deterministic output regards to feat order
-def get_morphology_parts(node: UD_node) -> List[str]:
-    lemma, pos = node.lemma, node.pos
-    feats = dict(f.split('=', 1) for f in node.get_feats() if '=' in f)
-    misc = dict(f.split('=', 1) for f in node.misc.split('|') if '=' in f)
-
+def _compute_morphology_parts(
+    lemma: str,
+    pos: str,
+    feats_string: str,
+    misc_key: Tuple[Tuple[str, str], ...]
+) -> List[str]:
     rvs = list()
     rvs += [UPOS_TO_POS_MAP.get(pos, 'Unkwn')]
     if pos == 'PROPN':
@@ -72,189 +232,11 @@ def get_morphology_parts(node: UD_node) -> List[str]:
     elif pos == 'ADV' and lemma.endswith("sti"):
         # This is FTB oddity
         rvs += ['Pos', 'Man']
+    feats = dict(f.split('=', 1) for f in feats_string.split('|') if '=' in f)
     for key, value in feats.items():
-        if key == 'Number':
-            if value == 'Sing':
-                rvs += ['Sg']
-            elif value == 'Plur':
-                rvs += ['Pl']
-        elif key == 'Tense':
-            if value == 'Pres':
-                rvs += ['Prs']
-            elif value == 'Past':
-                rvs += ['Prt']
-        elif key == 'Mood':
-            if value == 'Ind':
-                continue
-            elif value == 'Cnd':
-                rvs += ['Cond']
-            elif value == 'Impv':
-                rvs += ['Imp']
-            else:
-                rvs += [value]
-        elif key == 'Voice':
-            rvs += [value]
-        elif key == 'Person':
-            if value == '0':
-                rvs += ['__3']
-            elif value == '1':
-                rvs += ['__1']
-            elif value == '2':
-                rvs += ['__2']
-            elif value == '3':
-                rvs += ['__3']
-            elif value == '4':
-                rvs += ['Pe4']
-            else:
-                logger.warning(key, value, "for ftb")
-        elif key == 'Number[psor]':
-            if value == 'Sing':
-                rvs += ['PxSg_']
-            elif value == 'Plur':
-                rvs += ['PxPl_']
-            else:
-                logger.warning(key, value, "for ftb")
-        elif key == 'Person[psor]':
-            if value == '1':
-                rvs += ['Px__1']
-            elif value == '2':
-                rvs += ['Px__2']
-            elif value == '3':
-                rvs += ['PxSp3']
-            else:
-                logger.warning(key, value, "for ftb")
-        elif key == 'Polarity':
-            if value == 'Neg':
-                rvs += ['Neg']
-            else:
-                logger.warning(key, value, "for ftb")
-        elif key == 'Connegative':
-            if value == 'Yes':
-                rvs += ['Act', 'ConNeg']
-            else:
-                logger.warning(key, value, "for ftb")
-        elif key == 'InfForm':
-            if value == '1':
-                rvs += ['Inf1', 'Lat']
-            elif value == '2':
-                rvs += ['Inf2']
-            elif value == '3':
-                rvs += ['Inf3']
-            elif value == 'MINEN':
-                rvs += ['Inf4']
-            elif value == 'MAISILLA':
-                rvs += ['Inf5']
-        elif key == 'PartForm':
-            # FTB participle is POS
-            pass
-        elif key == 'Case':
-            rvs += [value]
-        elif key == 'Degree':
-            rvs += [value]
-        elif key == 'SUBCAT':
-            if value == 'NEG':
-                rvs += ['Neg']
-            elif value == 'QUOTATION':
-                rvs += ['Quote']
-            elif value == 'QUANTIFIER':
-                rvs += ['Qnt']
-            elif value == 'DIGIT':
-                rvs += ['Digit']
-            elif value in ['COMMA', 'BRACKET',
-                            'ARROW', 'DECIMAL', 'PREFIX', 'SUFFIX']:
-                # not annotated in FTN feats:
-                # * punctuation classes
-                continue
-            elif value == 'ROMAN':
-                # not annotated in FTN feats:
-                # * decimal, roman NumType
-                continue
-            else:
-                logger.warning(key, value, "SUBCAT")
-        elif key == 'NumType':
-            if value == 'Ord':
-                rvs += [value]
-            else:
-                pass
-        elif key == 'PronType':
-            if value == 'Prs':
-                rvs += ['Pers']
-            elif value == 'Ind':
-                rvs += ['Qnt']
-            elif value == 'Int':
-                rvs += ['Interr']
-            else:
-                rvs += [value]
-        elif key == 'AdpType':
-            if value == 'Post':
-                rvs += ['Po']
-            elif value == 'Prep':
-                rvs += ['Pr']
-            else:
-                logger.warning(key, value, 'ADPTYPE', 'FTB3')
-        elif key == 'Clitic':
-            if value == 'Ka':
-                rvs += ['Foc_kA']
-            else:
-                rvs += ['Foc_' + value]
-        elif key == 'Abbr':
-            rvs += ['Abbr']
-        elif key == 'Derivation':
-            if value in ['NUT', 'VA']:
-                rvs += ['Act']
-            elif value in ['TU', 'TAVA']:
-                rvs += ['Pss']
-            else:
-                continue
-        elif key == 'Reflex':
-            rvs += ['Refl']
-        elif key in ['UPOS', 'ALLO', 'WEIGHT', 'CASECHANGE', 'NEWPARA',
-                        'GUESS', 'PROPER', 'SEM', 'CONJ', 'BOUNDARY',
-                        'PCP', 'DRV', 'LEX', 'BLACKLIST', 'Style',
-                        'POSITION', "Foreign", 'VerbForm',
-                        'Typo']:
-            continue
-        else:
-            logger.warning(key, value, 'FTB3')
-    for key, value in misc.items():
-        if key == 'NumType':
-            rvs += [value]
-        elif key == 'Person' and value == '4':
-            rvs += ['Pe4']
-        elif key == 'PunctType':
-            if value == "Quotation":
-                rvs += ["Quote"]
-            elif value == "Dash":
-                if lemma == '—':
-                    rvs += ['EmDash']
-                elif lemma == '–':
-                    rvs += ['EnDash']
-                else:
-                    rvs += ['Dash']
-            elif value in ["Comma", "Bracket", "Arrow"]:
-                pass
-            else:
-                logger.warning(key, value, 'FTB3')
-        elif key == 'PropnType':
-            rvs += ["Prop"]
-        elif key in ['AffixType', "GoesWith", "Position"]:
-            # XXX
-            pass
-        elif key == 'SemType':
-            pass
-        elif key == "Derivation":
-            if value in ["Tava", "Tu"]:
-                rvs += ["Pass"]
-            elif value in ["Va", "Nut"]:
-                rvs += ["Act"]
-            else:
-                pass
-        elif key == "Mood":
-            if value == 'Opt':
-                rvs += ["Opt"]
-        elif key in ["Lexicalised", "Blacklisted"]:
-            continue
-        # ignore unknown misc
+        rvs += _feat_tags(key, value)
+    for key, value in misc_key:
+        rvs += _misc_tags(key, value, lemma)
     # post hacks
     if lemma == 'ei' and 'Foc_kA' in rvs:
         revs = []
@@ -353,6 +335,16 @@ def get_morphology_parts(node: UD_node) -> List[str]:
     return sorted(rvs, key=lambda x: order.get(x, 15))
 
 
+def get_morphology_parts(node: UD_node) -> List[str]:
+    return morphology_parts(node.lemma, node.pos, node.feats, node.misc)
+
+
+# lemma, UPOS, FEATS and MISC columns of a CoNLL-U word line
+def ud_morphology(lemma: str, pos: str, feats_string: str, misc_string: str) -> str:
+    parts = _morphology_parts(pos, feats_string, _misc_key(misc_string), _lemma_class(lemma))
+    feats = '+'.join(parts)
+    return f'{lemma}+{feats}'
+
+
 def ud_node_morphology(node: UD_node) -> str:
-    feats = '+'.join(get_morphology_parts(node))
-    return f'{node.lemma}+{feats}'
+    return ud_morphology(node.lemma, node.pos, node.feats, node.misc)
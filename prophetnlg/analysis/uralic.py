@@ -1,11 +1,49 @@
-from typing import Iterable, Iterator, List, Tuple
+from typing import Dict, Iterable, Iterator, List, Tuple
+from more_itertools import chunked
 from prophetnlg import Sentence, SentenceToken, WordAnalysis
+from prophetnlg.cache.lru import LRUCache
 from uralicNLP import uralicApi
 from uralicNLP.ud_tools import UD_node, UD_sentence
 from .nltk import SentenceAnalyzer
 
+DEFAULT_CACHE_SIZE = 100000
+DEFAULT_BATCH_SIZE = 32
+
 
 class UralicSentenceAnalyzer(SentenceAnalyzer):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = LRUCache(
+            maxsize=kwargs.get('cache_size', DEFAULT_CACHE_SIZE),
+            path=kwargs.get('cache_path'),
+            table='uralic_analyses'
+        )
+        self.batch_size = kwargs.get('batch_size', DEFAULT_BATCH_SIZE)
+
+    def _analyze(self, text: str) -> List[str]:
+        return [a[0] for a in uralicApi.analyze(text, self.lang)]
+
+    def get_morphologies(self, text: str) -> List[str]:
+        return self.cache.get_or_set((self.lang, text), lambda: self._analyze(text))
+
+    def analyze_type(self, text: str) -> WordAnalysis:
+        morphologies = self.get_morphologies(text)
+        return WordAnalysis(text=text, morphologies=dict.fromkeys(morphologies, 0.0))
+
     def analyze_token(self, token: SentenceToken, **kwargs) -> SentenceToken:
-        morphologies = [a[0] for a in uralicApi.analyze(token.text, self.lang)]
+        morphologies = self.get_morphologies(token.text)
         return token.with_morphologies(morphologies, 'uralic')
+
+    def analyze_sentences(self, sentences: Iterable[Sentence]) -> Iterator[Sentence]:
+        # analyses do not depend on context, so each word form of a batch is
+        # analyzed once and the analysis shared by its tokens
+        for batch in chunked(sentences, self.batch_size):
+            types: Dict[str, WordAnalysis] = {}
+            for sentence in batch:
+                tokens = []
+                for token in sentence.tokens:
+                    analysis = types.get(token.text)
+                    if analysis is None:
+                        analysis = types[token.text] = self.analyze_type(token.text)
+                    tokens.append(token.with_analysis(analysis, 'uralic'))
+                yield sentence.replace(tokens=tokens)
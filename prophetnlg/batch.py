@@ -0,0 +1,204 @@
+from __future__ import annotations
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple
+from more_itertools import chunked
+import numpy as np
+from prophetnlg import Sentence, SentenceToken
+
+
+# lookup tables kept per vocabulary, the oldest are dropped after this many
+MAX_LOOKUP_TABLES = 32
+
+
+class Vocabulary:
+    def __init__(self, strings: Iterable[str] = ('',)):
+        self.strings: List[str] = []
+        self.ids: Dict[str, int] = {}
+        # filled length and the table with room to grow, by mapping and default
+        self._tables: Dict[Hashable, Tuple[int, np.ndarray]] = {}
+        for s in strings:
+            self.intern(s)
+
+    def intern(self, string: str) -> int:
+        id_ = self.ids.get(string)
+        if id_ is None:
+            id_ = self.ids[string] = len(self.strings)
+            self.strings.append(string)
+        return id_
+
+    def get_id(self, string: str) -> int:
+        return self.ids.get(string, -1)
+
+    def lookup_table(self, mapping: Dict[str, float], default: float = 0.0) -> np.ndarray:
+        # read-only array indexed by string id, e.g. for mapping POS ids to
+        # effects. Tables are cached and only the strings interned since the
+        # last call are looked up, the capacity doubles as the vocabulary grows.
+        key = (tuple(sorted(mapping.items())), default)
+        size = len(self.strings)
+        filled, table = self._tables.pop(key, (0, np.empty(0)))
+        if filled < size:
+            if len(table) < size:
+                grown = np.full(max(size, 2 * len(table)), default, dtype=np.float64)
+                grown[:filled] = table[:filled]
+                table = grown
+            strings = self.strings
+            table[filled:size] = [mapping.get(strings[i], default) for i in range(filled, size)]
+        self._tables[key] = (size, table)
+        if len(self._tables) > MAX_LOOKUP_TABLES:
+            del self._tables[next(iter(self._tables))]
+        view = table[:size]
+        view.flags.writeable = False
+        return view
+
+    def __getitem__(self, id_: int) -> str:
+        return self.strings[id_]
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+
+class SentenceBatch:
+    # token columns are indexed by token position in the whole batch, and
+    # sentence_offsets[i]:sentence_offsets[i + 1] are the tokens of sentence i.
+    # lemma, pos and morphology ids are derived from the 'guess' analysis and
+    # are read-only, the other token columns are written back by to_sentences.
+    # Ids are comparable between batches that share a vocabulary, from_stream
+    # gives each stream a vocabulary of its own.
+    columns = (
+        'text_offsets', 'lemma_ids', 'pos_ids', 'morphology_ids', 'lang_ids',
+        'spacing_ids', 'cap', 'passthrough',
+        'sentence_offsets', 'sentence_passthrough', 'sentence_formatting',
+    )
+
+    def __init__(
+        self,
+        *,
+        vocabulary: Vocabulary,
+        text: str,
+        tokens: Sequence[SentenceToken],
+        **columns: np.ndarray
+    ):
+        self.vocabulary = vocabulary
+        self.text = text
+        # the source tokens are not part of the columns, they are a stopgap
+        # until analyses have columns of their own and only read when tokens
+        # are rebuilt with their analyses (iter_sentences, to_sentences)
+        self.tokens = tokens
+        for name in self.columns:
+            setattr(self, name, columns[name])
+
+    @classmethod
+    def from_sentences(
+        cls,
+        sentences: Iterable[Sentence],
+        vocabulary: Optional[Vocabulary] = None
+    ) -> SentenceBatch:
+        vocabulary = vocabulary if vocabulary is not None else Vocabulary()
+        intern = vocabulary.intern
+        texts: List[str] = []
+        tokens: List[SentenceToken] = []
+        lemma_ids, pos_ids, morphology_ids, lang_ids, spacing_ids = [], [], [], [], []
+        cap, passthrough = [], []
+        sentence_offsets = [0]
+        sentence_passthrough, sentence_formatting = [], []
+
+        for sentence in sentences:
+            for token in sentence.tokens:
+                tokens.append(token)
+                texts.append(token.text)
+                lemma_ids.append(intern(token.lemma))
+                pos_ids.append(intern(token.pos))
+                morphology_ids.append(intern(token.morphology))
+                lang_ids.append(intern(token.lang))
+                spacing_ids.append(intern(token.spaces_after))
+                cap.append(token.cap)
+                passthrough.append(token.passthrough)
+            sentence_offsets.append(len(tokens))
+            sentence_passthrough.append(sentence.passthrough)
+            sentence_formatting.append(sentence.formatting)
+
+        text_offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+        np.cumsum([len(t) for t in texts], out=text_offsets[1:])
+        return cls(
+            vocabulary=vocabulary,
+            text=''.join(texts),
+            tokens=tokens,
+            text_offsets=text_offsets,
+            lemma_ids=np.array(lemma_ids, dtype=np.int32),
+            pos_ids=np.array(pos_ids, dtype=np.int32),
+            morphology_ids=np.array(morphology_ids, dtype=np.int32),
+            lang_ids=np.array(lang_ids, dtype=np.int32),
+            spacing_ids=np.array(spacing_ids, dtype=np.int32),
+            cap=np.array(cap, dtype=bool),
+            passthrough=np.array(passthrough, dtype=np.int32),
+            sentence_offsets=np.array(sentence_offsets, dtype=np.int64),
+            sentence_passthrough=np.array(sentence_passthrough, dtype=np.int32),
+            sentence_formatting=np.array(sentence_formatting, dtype=bool),
+        )
+
+    @classmethod
+    def from_stream(
+        cls,
+        sentences: Iterable[Sentence],
+        batch_size: int,
+        vocabulary: Optional[Vocabulary] = None
+    ) -> Iterator[SentenceBatch]:
+        # batches of batch_size sentences that share one vocabulary
+        vocabulary = vocabulary if vocabulary is not None else Vocabulary()
+        for chunk in chunked(sentences, batch_size):
+            yield cls.from_sentences(chunk, vocabulary=vocabulary)
+
+    def __len__(self) -> int:
+        return len(self.sentence_offsets) - 1
+
+    @property
+    def n_tokens(self) -> int:
+        return len(self.text_offsets) - 1
+
+    @property
+    def sentence_ids(self) -> np.ndarray:
+        return np.repeat(np.arange(len(self)), np.diff(self.sentence_offsets))
+
+    @property
+    def token_sentence_passthrough(self) -> np.ndarray:
+        return self.sentence_passthrough[self.sentence_ids]
+
+    def token_text(self, index: int) -> str:
+        return self.text[self.text_offsets[index]:self.text_offsets[index + 1]]
+
+    def replace(self, **columns) -> SentenceBatch:
+        attrs = {name: getattr(self, name) for name in self.columns}
+        attrs.update(columns)
+        return SentenceBatch(
+            vocabulary=attrs.pop('vocabulary', self.vocabulary),
+            text=attrs.pop('text', self.text),
+            tokens=attrs.pop('tokens', self.tokens),
+            **attrs
+        )
+
+    def _get_token(self, index: int) -> SentenceToken:
+        token = self.tokens[index]
+        text = self.token_text(index)
+        lang = self.vocabulary[self.lang_ids[index]]
+        spaces_after = self.vocabulary[self.spacing_ids[index]]
+        cap = bool(self.cap[index])
+        passthrough = int(self.passthrough[index])
+        if (
+            token.text == text and token.lang == lang and token.spaces_after == spaces_after
+            and token.cap == cap and token.passthrough == passthrough
+        ):
+            return token
+        return token.replace(
+            text=text, lang=lang, spaces_after=spaces_after, cap=cap, passthrough=passthrough
+        )
+
+    def iter_sentences(self) -> Iterator[Sentence]:
+        offsets = self.sentence_offsets.tolist()
+        for i in range(len(self)):
+            yield Sentence(
+                tokens=[self._get_token(t) for t in range(offsets[i], offsets[i + 1])],
+                formatting=bool(self.sentence_formatting[i]),
+                passthrough=int(self.sentence_passthrough[i]),
+            )
+
+    def to_sentences(self) -> List[Sentence]:
+        return list(self.iter_sentences())
@@ -0,0 +1,83 @@
+import json
+import mmap
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Mapping, Tuple, Union
+import numpy as np
+
+# File layout: magic, header length (uint64 LE), JSON header and the array
+# data aligned to ALIGNMENT bytes. Arrays are memory-mapped read-only on load,
+# so the pages are shared between processes using the same file.
+MAGIC = b'PNLGARR1'
+ALIGNMENT = 64
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def save_arrays(path: Union[str, Path], arrays: Mapping[str, np.ndarray]):
+    path = Path(path)
+    header = {}
+    offset = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        header[name] = [array.dtype.str, list(array.shape), offset]
+        offset = _align(offset + array.nbytes)
+    header_bytes = json.dumps(header).encode('utf-8')
+    data_start = _align(len(MAGIC) + 8 + len(header_bytes))
+
+    # write to a temporary file first, so readers never see partial files
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(len(header_bytes).to_bytes(8, 'little'))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(data_start + header[name][2])
+            f.write(np.ascontiguousarray(array).tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+
+
+def load_arrays(path: Union[str, Path]) -> Dict[str, np.ndarray]:
+    with open(path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if buffer[:len(MAGIC)] != MAGIC:
+        raise ValueError(f'{path} is not an array file')
+    header_start = len(MAGIC) + 8
+    header_length = int.from_bytes(buffer[len(MAGIC):header_start], 'little')
+    header = json.loads(buffer[header_start:header_start + header_length].decode('utf-8'))
+    data_start = _align(header_start + header_length)
+
+    arrays = {}
+    for name, (dtype, shape, offset) in header.items():
+        count = int(np.prod(shape))
+        array = np.frombuffer(buffer, dtype=np.dtype(dtype), count=count, offset=data_start + offset)
+        arrays[name] = array.reshape(shape)
+    return arrays
+
+
+class StringArray:
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        self.data = data
+        self.offsets = offsets
+
+    @staticmethod
+    def encode(strings: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+        encoded = [s.encode('utf-8') for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        data = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        return data, offsets
+
+    def __getitem__(self, index: int) -> str:
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return self.data[start:end].tobytes().decode('utf-8')
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
@@ -0,0 +1,97 @@
+import hashlib
+import os
+from pathlib import Path
+import threading
+from typing import Iterator, Optional, Union
+from .lru import CacheStats
+
+DEFAULT_MAX_SIZE = 1 << 30
+
+
+class TextDiskCache:
+    # Content-addressed text files under path/<2 hex>/<sha256>. Hits touch
+    # the file, and when the total size grows over max_size the least
+    # recently used files are removed until it is under 90% of max_size.
+    def __init__(self, path: Union[str, Path], max_size: int = DEFAULT_MAX_SIZE, suffix: str = '.txt'):
+        self.path = Path(path)
+        self.max_size = max_size
+        self.suffix = suffix
+        self.stats = CacheStats()
+        self.evictions = 0
+        self.lock = threading.Lock()
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.size = sum(f.stat().st_size for f in self._files())
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def _file(self, key: str) -> Path:
+        return self.path / key[:2] / f'{key}{self.suffix}'
+
+    def _files(self) -> Iterator[Path]:
+        return self.path.glob(f'??/*{self.suffix}')
+
+    def get(self, key: str) -> Optional[str]:
+        path = self._file(key)
+        try:
+            text = path.read_text(encoding='utf-8')
+            os.utime(path)
+        except FileNotFoundError:
+            # also when evicted by another process in between
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return text
+
+    def __setitem__(self, key: str, text: str):
+        path = self._file(key)
+        path.parent.mkdir(exist_ok=True)
+        data = text.encode('utf-8')
+        # write to a temporary file first, so readers never see partial files
+        tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+        tmp_path.write_bytes(data)
+        # an overwritten file no longer counts towards the size
+        try:
+            old_size = path.stat().st_size
+        except FileNotFoundError:
+            old_size = 0
+        os.replace(tmp_path, path)
+        with self.lock:
+            self.size += len(data) - old_size
+            if self.size > self.max_size:
+                self._evict()
+
+    def _evict(self):
+        files = []
+        for f in self._files():
+            try:
+                stat = f.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, f))
+        files.sort()
+        self.size = sum(size for _, size, _ in files)
+        target = self.max_size * 0.9
+        for _, size, f in files:
+            if self.size <= target:
+                break
+            try:
+                f.unlink()
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+            self.size -= size
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._files())
+
+    def clear(self):
+        with self.lock:
+            for f in self._files():
+                f.unlink()
+            self.size = 0
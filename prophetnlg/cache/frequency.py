@@ -0,0 +1,177 @@
+from bisect import bisect_left
+from pathlib import Path
+import random
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import numpy as np
+from uralicNLP import semfi
+from .arrays import StringArray, load_arrays, save_arrays
+
+
+def get_index_path() -> Path:
+    return Path(semfi.__where_semfi('fin')).with_name('semfi.index')
+
+
+class PosFrequencies:
+    # words and frequencies are sorted by descending frequency, ids are
+    # sorted for binary search and id_rows maps them to the word rows
+    def __init__(self, arrays: Dict[str, np.ndarray], pos: str):
+        self.words = StringArray(arrays[f'{pos}.words'], arrays[f'{pos}.word_offsets'])
+        self.frequencies = arrays[f'{pos}.frequencies']
+        self.ids = StringArray(arrays[f'{pos}.ids'], arrays[f'{pos}.id_offsets'])
+        self.id_rows = arrays[f'{pos}.id_rows']
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def find(self, id_: str) -> int:
+        idx = bisect_left(self.ids, id_)
+        if idx < len(self.ids) and self.ids[idx] == id_:
+            return int(self.id_rows[idx])
+        return -1
+
+
+class FrequencyIndex:
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.arrays = arrays
+        self.pos_names = set(StringArray(arrays['pos'], arrays['pos_offsets']))
+        self._pos: Dict[str, PosFrequencies] = {}
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'FrequencyIndex':
+        return cls(load_arrays(path))
+
+    def get_pos(self, pos: str) -> Optional[PosFrequencies]:
+        # views are created lazily, pages are read in when first used
+        if pos not in self._pos:
+            self._pos[pos] = PosFrequencies(self.arrays, pos) if pos in self.pos_names else None
+        return self._pos[pos]
+
+    def get_most_common(self, pos: str, n: int = 1) -> List[str]:
+        frequencies = self.get_pos(pos)
+        if not frequencies:
+            return []
+        return [frequencies.words[i] for i in range(min(n, len(frequencies)))]
+
+    def get_random(self, pos: str, n: int = 1) -> List[str]:
+        frequencies = self.get_pos(pos)
+        if not frequencies:
+            return []
+        rows = random.sample(range(len(frequencies)), min(n, len(frequencies)))
+        return [frequencies.words[i] for i in rows]
+
+    def get_frequencies(self, lemmas_pos: Iterable[Tuple[str, str]]) -> Dict[str, float]:
+        result = {}
+        for lemma, pos in lemmas_pos:
+            frequencies = self.get_pos(pos)
+            row = frequencies.find(f'{lemma}_{pos}') if frequencies else -1
+            if row >= 0:
+                result[frequencies.words[row]] = frequencies.frequencies[row].item()
+        return result
+
+
+class AliasTable:
+    # Vose's alias method: draw column i uniformly, keep it with probability
+    # prob[i] and take alias[i] otherwise, so each draw is O(1)
+    def __init__(self, weights: np.ndarray):
+        n = len(weights)
+        scaled = weights * (n / weights.sum())
+        self.prob = np.ones(n, dtype=np.float64)
+        self.alias = np.arange(n, dtype=np.int64)
+        small = np.flatnonzero(scaled < 1.0).tolist()
+        large = np.flatnonzero(scaled >= 1.0).tolist()
+        while small and large:
+            s, l = small.pop(), large[-1]
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            if scaled[l] < 1.0:
+                small.append(large.pop())
+
+    def __len__(self) -> int:
+        return len(self.prob)
+
+    def draw(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        columns = rng.integers(len(self.prob), size=n)
+        keep = rng.random(n) < self.prob[columns]
+        return np.where(keep, columns, self.alias[columns])
+
+
+class FrequencySampler:
+    # Frequency weighted lemma sampling from an index. Weights are
+    # frequency ** (1 / temperature), so temperatures above 1 flatten the
+    # distribution, and words below min_frequency are never drawn.
+    def __init__(
+        self,
+        index: FrequencyIndex,
+        *,
+        temperature: float = 1.0,
+        min_frequency: float = 0.0,
+        seed: Union[None, int, np.random.Generator] = None
+    ):
+        if temperature <= 0:
+            raise ValueError('temperature must be positive')
+        self.index = index
+        self.temperature = temperature
+        self.min_frequency = min_frequency
+        self.rng = np.random.default_rng(seed)
+        self._tables: Dict[str, Optional[AliasTable]] = {}
+
+    def get_table(self, pos: str) -> Optional[AliasTable]:
+        if pos not in self._tables:
+            frequencies = self.index.get_pos(pos)
+            table = None
+            if frequencies:
+                # rows are in descending frequency, so the floor cuts a tail
+                count = int(np.count_nonzero(frequencies.frequencies >= self.min_frequency))
+                if count:
+                    weights = frequencies.frequencies[:count] ** (1.0 / self.temperature)
+                    table = AliasTable(weights)
+            self._tables[pos] = table
+        return self._tables[pos]
+
+    def sample(self, pos: str, n: int = 1) -> List[str]:
+        table = self.get_table(pos)
+        if not table:
+            return []
+        words = self.index.get_pos(pos).words
+        return [words[i] for i in table.draw(self.rng, n).tolist()]
+
+    def stream(self, pos: str, batch_size: int = 1024) -> Iterator[str]:
+        # infinite, usable as a replacement stream of LemmaReplaceStreamTransform
+        while True:
+            words = self.sample(pos, batch_size)
+            if not words:
+                return
+            yield from words
+
+    def streams(self, pos_names: Iterable[str], batch_size: int = 1024) -> Dict[str, Iterator[str]]:
+        return {pos: self.stream(pos, batch_size) for pos in pos_names}
+
+
+def build_arrays(rows: Iterable[Tuple[str, str, str, float]]) -> Dict[str, np.ndarray]:
+    # rows are (pos, id, word, frequency) in descending frequency
+    by_pos: Dict[str, List[Tuple[str, str, float]]] = {}
+    for pos, id_, word, frequency in rows:
+        by_pos.setdefault(pos, []).append((id_, word, frequency))
+
+    arrays = {}
+    for pos, pos_rows in by_pos.items():
+        ids, words, frequencies = zip(*pos_rows)
+        id_rows = sorted(range(len(ids)), key=ids.__getitem__)
+        arrays[f'{pos}.words'], arrays[f'{pos}.word_offsets'] = StringArray.encode(words)
+        arrays[f'{pos}.frequencies'] = np.array(frequencies, dtype=np.float64)
+        arrays[f'{pos}.ids'], arrays[f'{pos}.id_offsets'] = StringArray.encode(ids[i] for i in id_rows)
+        arrays[f'{pos}.id_rows'] = np.array(id_rows, dtype=np.int32)
+    arrays['pos'], arrays['pos_offsets'] = StringArray.encode(by_pos)
+    return arrays
+
+
+def main():
+    conn = semfi.__get_connection('fin')
+    sql = 'SELECT pos, id, word, frequency FROM words WHERE frequency > 1 ORDER BY frequency DESC'
+    conn.execute(sql)
+    save_arrays(get_index_path(), build_arrays(conn))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+from collections import OrderedDict
+import json
+from pathlib import Path
+import sqlite3
+import threading
+from typing import Any, Callable, Hashable, Optional, Union
+import weakref
+
+MISSING = object()
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def reset(self):
+        self.hits = self.disk_hits = self.misses = 0
+
+    def __repr__(self) -> str:
+        return (
+            f'CacheStats(hits={self.hits}, disk_hits={self.disk_hits}, '
+            f'misses={self.misses}, hit_rate={self.hit_rate:.3f})'
+        )
+
+
+class SQLiteStore:
+    def __init__(self, path: Union[str, Path], table: str = 'cache', commit_interval: int = 1000):
+        self.table = table
+        self.commit_interval = commit_interval
+        self.pending = 0
+        self.conn = sqlite3.connect(Path(path).as_posix(), check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute(f'CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value TEXT)')
+
+    def get(self, key: str) -> Any:
+        row = self.conn.execute(f'SELECT value FROM {self.table} WHERE key=?', (key,)).fetchone()
+        return json.loads(row[0]) if row else MISSING
+
+    def set(self, key: str, value: Any):
+        self.conn.execute(
+            f'INSERT OR REPLACE INTO {self.table} VALUES (?, ?)',
+            (key, json.dumps(value, ensure_ascii=False))
+        )
+        self.pending += 1
+        if self.pending >= self.commit_interval:
+            self.commit()
+
+    def commit(self):
+        self.conn.commit()
+        self.pending = 0
+
+    def close(self):
+        self.commit()
+        self.conn.close()
+
+
+# values are JSON serialized in the backing store, so tuples come back as lists
+class LRUCache:
+    def __init__(
+        self,
+        maxsize: int = 65536,
+        path: Optional[Union[str, Path]] = None,
+        table: str = 'cache'
+    ):
+        self.maxsize = maxsize
+        self.data: OrderedDict = OrderedDict()
+        self.stats = CacheStats()
+        self.path = path
+        self.table = table
+        self.lock = threading.RLock()
+        self.store: Optional[SQLiteStore] = None
+        if path:
+            self._open_store()
+
+    def _open_store(self):
+        self.store = SQLiteStore(self.path, self.table)
+        self._finalizer = weakref.finalize(self, self.store.close)
+
+    # the lock and the store connection can't be pickled, a copy gets its own
+    # ones and its own connection to the same store
+    def __getstate__(self) -> dict:
+        self.flush()
+        state = self.__dict__.copy()
+        state['store'] = self.store is not None
+        del state['lock']
+        state.pop('_finalizer', None)
+        return state
+
+    def __setstate__(self, state: dict):
+        has_store = state.pop('store')
+        self.__dict__.update(state)
+        self.lock = threading.RLock()
+        self.store = None
+        if has_store:
+            self._open_store()
+
+    def _store_key(self, key: Hashable) -> str:
+        return json.dumps(key, ensure_ascii=False)
+
+    def _remember(self, key: Hashable, value: Any):
+        self.data[key] = value
+        self.data.move_to_end(key)
+        while len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+
+    def lookup(self, key: Hashable) -> Any:
+        with self.lock:
+            value = self.data.get(key, MISSING)
+            if value is not MISSING:
+                self.data.move_to_end(key)
+                self.stats.hits += 1
+                return value
+            if self.store:
+                value = self.store.get(self._store_key(key))
+                if value is not MISSING:
+                    self._remember(key, value)
+                    self.stats.hits += 1
+                    self.stats.disk_hits += 1
+                    return value
+            self.stats.misses += 1
+            return MISSING
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        value = self.lookup(key)
+        return default if value is MISSING else value
+
+    def __setitem__(self, key: Hashable, value: Any):
+        with self.lock:
+            self._remember(key, value)
+            if self.store:
+                self.store.set(self._store_key(key), value)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.data
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def get_or_set(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        value = self.lookup(key)
+        if value is MISSING:
+            value = func()
+            self[key] = value
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+    def flush(self):
+        if self.store:
+            with self.lock:
+                self.store.commit()
+
+    def close(self):
+        if self.store:
+            self._finalizer()
+            self.store = None
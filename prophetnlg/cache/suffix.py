@@ -1,48 +1,105 @@
-from collections import defaultdict
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import os
 from pathlib import Path
 import sqlite3
+import sys
+import time
+from typing import List, Tuple
+from more_itertools import chunked
 from uralicNLP import semfi, uralicApi
+from prophetnlg.parallel import imap_ordered
+from .trie import build_trie_file
 
+SOURCE_FILTER = 'frequency > 2 AND pos IN ("N", "V", "A")'
 
-def main():
+
+def get_source_path() -> str:
     source_conn = semfi.__get_connection('fin')
-    path = ''
     for id_, name, filename in source_conn.execute('PRAGMA database_list'):
         if name == 'main' and filename is not None:
-            path = filename
-            break
+            return filename
+    return ''
+
+
+def analyze_words(words: List[Tuple[str, str]]) -> List[Tuple[str, str, bool]]:
+    # runs in the worker processes
+    return [(word, pos, bool(uralicApi.analyze(word.split('|')[-1], 'fin'))) for word, pos in words]
+
+
+def prepare_target(conn: sqlite3.Connection, full: bool):
+    tables = {r[0] for r in conn.execute('SELECT name FROM sqlite_master WHERE type="table"')}
+    # tables built before incremental builds have no record of built words
+    if full or 'built_words' not in tables:
+        conn.execute('DROP TABLE IF EXISTS suffixes')
+        conn.execute('DROP TABLE IF EXISTS built_words')
+    conn.execute('CREATE TABLE IF NOT EXISTS suffixes (suffix TEXT, word TEXT, pos TEXT)')
+    # first (most frequent) word of a suffix is kept with INSERT OR IGNORE
+    conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_suffix_pos ON suffixes (suffix, pos)')
+    conn.execute('CREATE TABLE IF NOT EXISTS built_words (word TEXT, pos TEXT, known INTEGER, PRIMARY KEY (word, pos))')
+    conn.commit()
+
+
+def print_progress(done: int, total: int, started: float):
+    rate = done / max(time.monotonic() - started, 1e-9)
+    print(f'\r{done}/{total} words, {rate:.0f} words/s', end='', file=sys.stderr, flush=True)
+
+
+def build(source_path: str, target_path: Path, full: bool = False, workers: int = 0, batch_size: int = 500):
+    workers = workers or os.cpu_count() or 1
+    conn = sqlite3.connect(target_path.as_posix())
+    conn.execute('PRAGMA journal_mode=WAL')
+    prepare_target(conn, full)
+
+    # new words are read through a separate connection, so that the
+    # snapshot being read is not affected by the inserts
+    reader = sqlite3.connect(target_path.as_posix())
+    reader.execute('ATTACH DATABASE ? AS source', (source_path,))
+    new_words = f'''
+        FROM source.words w WHERE {SOURCE_FILTER} AND NOT EXISTS (
+            SELECT 1 FROM built_words b WHERE b.word = w.word AND b.pos = w.pos
+        )
+    '''
+    total = reader.execute(f'SELECT count(*) {new_words}').fetchone()[0]
+    rows = reader.execute(f'SELECT word, pos {new_words} ORDER BY pos, frequency DESC')
+
+    done = 0
+    started = time.monotonic()
+    with ProcessPoolExecutor(workers) as executor:
+        batches = imap_ordered(executor, analyze_words, chunked(rows, batch_size), max_pending=4 * workers)
+        for batch in batches:
+            for word, pos, known in batch:
+                # don't cache unknown words
+                if known:
+                    word = word.split('|')[-1]
+                    conn.executemany(
+                        'INSERT OR IGNORE INTO suffixes VALUES (?, ?, ?)',
+                        ((word[i:], word, pos) for i in range(len(word)))
+                    )
+            conn.executemany('INSERT OR IGNORE INTO built_words VALUES (?, ?, ?)', batch)
+            conn.commit()
+            done += len(batch)
+            print_progress(done, total, started)
+    print(file=sys.stderr)
+    reader.close()
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the suffix cache used in morphological generation.')
+    parser.add_argument('--full', action='store_true', help='rebuild from scratch instead of adding new words')
+    parser.add_argument('--workers', type=int, default=0, help='analyzer processes, defaults to CPU count')
+    parser.add_argument('--batch-size', type=int, default=500)
+    args = parser.parse_args()
+
+    path = get_source_path()
     if not path:
         print('SQLite file path not found.')
         return
 
-    source_path = Path(path)
-    target_path = source_path.with_name('cache.db')
-    target_conn = sqlite3.connect(target_path.as_posix())
-
-    prefixes = defaultdict(dict)
-
-    query = 'SELECT word, pos from words WHERE frequency > 2 AND pos IN ("N", "V", "A") ORDER BY pos, frequency DESC'
-    source_conn.execute(query)
-    for word, pos in source_conn:
-        word = word.split('|')[-1]
-        analysis = uralicApi.analyze(word, 'fin')
-        # don't cache unknown words
-        if not analysis:
-            continue
-        for i, c in enumerate(word):
-            word_part = word[i:]
-            prefixes[pos].setdefault(word_part, word)
-
-    target_conn.execute('DROP TABLE IF EXISTS suffixes')
-    target_conn.execute('CREATE TABLE suffixes (suffix TEXT, word TEXT, pos TEXT)')
-    for pos in prefixes:
-        pos_prefixes = prefixes[pos]
-        mass_insert = f'INSERT INTO suffixes VALUES (?, ?, ?)'
-        values = [(suffix, word, pos) for suffix, word in pos_prefixes.items()]
-        target_conn.executemany(mass_insert, values)
-    target_conn.execute('CREATE INDEX idx_suffix_pos ON suffixes (suffix, pos)')
-    target_conn.commit()
-    target_conn.close()
+    target_path = Path(path).with_name('cache.db')
+    build(path, target_path, full=args.full, workers=args.workers, batch_size=args.batch_size)
+    build_trie_file(target_path, target_path.with_name('suffixes.trie'))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,112 @@
+from pathlib import Path
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+import numpy as np
+from uralicNLP import uralicApi
+from .arrays import StringArray, load_arrays, save_arrays
+
+
+class SuffixTrie:
+    # Per-POS tries over reversed suffixes in flat arrays: the edges of node n
+    # are edge_start[n]:edge_start[n + 1], sorted by character code, and
+    # node_word[n] is the word of the suffix ending at n or -1.
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.edge_start = arrays['edge_start']
+        self.edge_char = arrays['edge_char']
+        self.edge_child = arrays['edge_child']
+        self.node_word = arrays['node_word']
+        self.words = StringArray(arrays['words'], arrays['word_offsets'])
+        pos_names = StringArray(arrays['pos'], arrays['pos_offsets'])
+        self.roots = dict(zip(pos_names, arrays['roots'].tolist()))
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'SuffixTrie':
+        return cls(load_arrays(path))
+
+    @staticmethod
+    def build_arrays(rows: Iterable[Tuple[str, str, str]]) -> Dict[str, np.ndarray]:
+        # rows are (suffix, word, pos) as in the suffixes table, the first
+        # word of each suffix is kept
+        children: List[Dict[str, int]] = []
+        node_word: List[int] = []
+        roots: Dict[str, int] = {}
+        word_ids: Dict[str, int] = {}
+
+        def new_node() -> int:
+            children.append({})
+            node_word.append(-1)
+            return len(children) - 1
+
+        for suffix, word, pos in rows:
+            node = roots.get(pos)
+            if node is None:
+                node = roots[pos] = new_node()
+            for char in reversed(suffix):
+                child = children[node].get(char)
+                if child is None:
+                    child = children[node][char] = new_node()
+                node = child
+            if node_word[node] == -1:
+                node_word[node] = word_ids.setdefault(word, len(word_ids))
+
+        edge_start = np.zeros(len(children) + 1, dtype=np.int64)
+        edge_char: List[int] = []
+        edge_child: List[int] = []
+        for node, edges in enumerate(children):
+            for char in sorted(edges):
+                edge_char.append(ord(char))
+                edge_child.append(edges[char])
+            edge_start[node + 1] = len(edge_char)
+
+        words, word_offsets = StringArray.encode(word_ids)
+        pos, pos_offsets = StringArray.encode(roots)
+        return {
+            'edge_start': edge_start,
+            'edge_char': np.array(edge_char, dtype=np.uint32),
+            'edge_child': np.array(edge_child, dtype=np.int32),
+            'node_word': np.array(node_word, dtype=np.int32),
+            'words': words,
+            'word_offsets': word_offsets,
+            'pos': pos,
+            'pos_offsets': pos_offsets,
+            'roots': np.array(list(roots.values()), dtype=np.int64),
+        }
+
+    @classmethod
+    def build(cls, rows: Iterable[Tuple[str, str, str]]) -> 'SuffixTrie':
+        return cls(cls.build_arrays(rows))
+
+    def find(self, word: str, pos: str) -> Optional[Tuple[str, str]]:
+        # longest suffix of word that is in the trie, and its word
+        node = self.roots.get(pos)
+        if node is None:
+            return None
+        best_word, best_length = -1, 0
+        for length, char in enumerate(reversed(word), 1):
+            start, end = self.edge_start[node], self.edge_start[node + 1]
+            code = ord(char)
+            idx = start + int(np.searchsorted(self.edge_char[start:end], code))
+            if idx >= end or self.edge_char[idx] != code:
+                break
+            node = self.edge_child[idx]
+            if self.node_word[node] >= 0:
+                best_word, best_length = self.node_word[node], length
+        if best_word < 0:
+            return None
+        return self.words[best_word], word[len(word) - best_length:]
+
+
+def build_trie_file(cache_db: Union[str, Path], path: Union[str, Path]):
+    conn = sqlite3.connect(Path(cache_db).as_posix())
+    rows = conn.execute('SELECT suffix, word, pos FROM suffixes ORDER BY rowid')
+    save_arrays(path, SuffixTrie.build_arrays(rows))
+    conn.close()
+
+
+def main():
+    cache_db = Path(uralicApi.__where_models('fin')) / 'cache.db'
+    build_trie_file(cache_db, cache_db.with_name('suffixes.trie'))
+
+
+if __name__ == '__main__':
+    main()
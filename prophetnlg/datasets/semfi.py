@@ -1,40 +1,93 @@
 from collections import defaultdict
+from pathlib import Path
+import random
 import sqlite3
 from typing import Dict, Iterable, List, Optional, Tuple
-from more_itertools import flatten, take
+from more_itertools import chunked, take
+import numpy as np
 from randomdict import RandomDict
 from uralicNLP import semfi
+from prophetnlg.cache.frequency import FrequencyIndex, FrequencySampler, build_arrays, get_index_path
 
 get_db_conn = semfi.__get_connection
+where_semfi = semfi.__where_semfi
 _cache = defaultdict(RandomDict)
+_index: Optional[FrequencyIndex] = None
+
+
+def get_frequency_index() -> Optional[FrequencyIndex]:
+    # prebuilt with prophetnlg.cache.frequency, shared by all SemFi instances
+    global _index
+    if _index is None:
+        path = get_index_path()
+        if path.exists():
+            _index = FrequencyIndex.load(path)
+    return _index
 
 
 class SemFiSQL:
+    # sem.db is opened read-only and immutable, so SQLite skips locking and
+    # can serve pages straight from the memory map
+    mmap_size = 1 << 30
+    max_variables = 900
+
     def __init__(self, db_filename: Optional[str] = None):
-        self.conn = get_db_conn('fin')
+        path = Path(db_filename or where_semfi('fin')).resolve()
+        self.conn = sqlite3.connect(f'{path.as_uri()}?mode=ro&immutable=1', uri=True, check_same_thread=False)
+        self.conn.execute(f'PRAGMA mmap_size={self.mmap_size}')
+        self._rowid_ranges: Dict[str, Tuple[np.ndarray, np.ndarray, int]] = {}
 
     def get_most_common(self, pos: str, n: int = 1) -> List[str]:
         sql = 'SELECT word FROM words WHERE pos=? ORDER BY frequency DESC LIMIT ?'
-        self.conn.execute(sql, (pos, n))
-        return [r[0] for r in self.conn.fetchall()]
+        return [r[0] for r in self.conn.execute(sql, (pos, n))]
+
+    def _get_rowid_ranges(self, pos: str) -> Tuple[np.ndarray, np.ndarray, int]:
+        # rowids of a POS as runs of consecutive rowids: run starts, the
+        # number of rows before each run and the row count of the POS
+        if pos not in self._rowid_ranges:
+            sql = 'SELECT rowid FROM words WHERE pos=? ORDER BY rowid'
+            rowids = np.fromiter((r[0] for r in self.conn.execute(sql, (pos,))), dtype=np.int64)
+            breaks = np.flatnonzero(np.diff(rowids) != 1) + 1
+            starts = rowids[np.r_[0, breaks]] if len(rowids) else rowids
+            before = np.r_[0, breaks] if len(rowids) else rowids
+            self._rowid_ranges[pos] = (starts, before, len(rowids))
+        return self._rowid_ranges[pos]
 
     def get_random(self, pos: str, n: int = 1) -> List[str]:
-        sql = 'SELECT word FROM words WHERE pos=? ORDER BY random() LIMIT ?'
-        self.conn.execute(sql, (pos, n))
-        return [r[0] for r in self.conn.fetchall()]
+        starts, before, count = self._get_rowid_ranges(pos)
+        if not count:
+            return []
+        rows = np.array(random.sample(range(count), min(n, count)), dtype=np.int64)
+        runs = np.searchsorted(before, rows, side='right') - 1
+        rowids = (starts[runs] + rows - before[runs]).tolist()
+        words = {}
+        for chunk in chunked(rowids, self.max_variables):
+            placeholders = ','.join('?' * len(chunk))
+            sql = f'SELECT rowid, word FROM words WHERE rowid IN ({placeholders})'
+            words.update(self.conn.execute(sql, chunk))
+        return [words[rowid] for rowid in rowids]
 
     def get_frequencies(self, lemmas_pos: Iterable[Tuple[str, str]]) -> Dict[str, float]:
-        word_placeholder = ' OR '.join('(id LIKE ? and pos=?)' for x in lemmas_pos)
-        sql = f'SELECT word, frequency FROM words WHERE {word_placeholder}'
-        params = [('{word}_%', pos) for word, pos in lemmas_pos]
-        self.conn.execute(sql, list(flatten(params)))
-        return dict(self.conn.fetchall())
+        # ids are f'{lemma}_{pos}', so the primary key index is used instead
+        # of scanning the table with LIKE
+        ids = list(dict.fromkeys(f'{lemma}_{pos}' for lemma, pos in lemmas_pos))
+        result = {}
+        for chunk in chunked(ids, self.max_variables):
+            placeholders = ','.join('?' * len(chunk))
+            sql = f'SELECT word, frequency FROM words WHERE id IN ({placeholders})'
+            result.update(self.conn.execute(sql, chunk))
+        return result
+
+    def close(self):
+        self.conn.close()
 
 
 class SemFi:
     def __init__(self, db_filename: Optional[str] = None):
         self.conn = get_db_conn('fin')
-        self._preload_cache()
+        self.index = get_frequency_index()
+        if not self.index:
+            self._preload_cache()
 
     def _preload_cache(self):
         if not _cache:
@@ -44,10 +97,23 @@ class SemFi:
                 _cache[pos][id] = (word, frequency)
 
     def get_most_common(self, pos: str, n: int = 1) -> List[str]:
+        if self.index:
+            return self.index.get_most_common(pos, n)
         return [x[0] for x in take(_cache[pos], n)]
 
     def get_random(self, pos: str, n: int = 1) -> List[str]:
+        if self.index:
+            return self.index.get_random(pos, n)
         return [x[0] for x in _cache[pos].random_sample(n)]
 
     def get_frequencies(self, lemmas_pos: Iterable[Tuple[str, str]]) -> Dict[str, float]:
+        if self.index:
+            return self.index.get_frequencies(lemmas_pos)
         return dict(_cache[p][f'{l}_{p}'] for l, p in lemmas_pos if _cache[p].get(f'{l}_{p}'))
+
+    def get_sampler(self, **kwargs) -> FrequencySampler:
+        index = self.index
+        if not index:
+            rows = ((p, i, w, f) for p, words in _cache.items() for i, (w, f) in words.items())
+            index = FrequencyIndex(build_arrays(rows))
+        return FrequencySampler(index, **kwargs)
@@ -1,14 +1,22 @@
 import os
 from pathlib import Path
 import sqlite3
-from typing import cast, Optional, Tuple, Union
+from typing import cast, List, Optional, Tuple, Union
+from pydantic import PrivateAttr
 from uralicNLP import uralicApi, semfi
 from prophetnlg import SentenceToken
+from prophetnlg.cache.lru import LRUCache
+from prophetnlg.cache.trie import SuffixTrie
 from .base import SentenceTokenGeneratorBase
 
+DEFAULT_CACHE_SIZE = 100000
+
 
 cache_path = Path(uralicApi.__where_models('fin')) / 'cache.db'
 cache_db = sqlite3.connect(cache_path.as_posix())
+# built from the suffixes table with prophetnlg.cache.trie
+suffix_trie_path = cache_path.with_name('suffixes.trie')
+suffix_trie = SuffixTrie.load(suffix_trie_path) if suffix_trie_path.exists() else None
 
 
 def get_lemma_text(lemma_or_token: Union[str, SentenceToken]) -> str:
@@ -26,13 +34,20 @@ def common_suffix(*words: str) -> str:
     return os.path.commonprefix([w[::-1] for w in words])[::-1]
 
 
-def find_similar_and_suffix(word: str, pos: str) -> Tuple[str, str]:
+def _find_similar_and_suffix_sql(word: str, pos: str) -> Optional[Tuple[str, str]]:
     c = cache_db.cursor()
     words = [word[idx:] for idx in range(len(word))]
     placeholders = ','.join('?' for char in word)
     sql = f'SELECT word, suffix FROM suffixes WHERE pos = ? AND suffix in ({placeholders}) ORDER BY length(suffix) DESC LIMIT 1'
     c.execute(sql, [pos] + words)
-    result = c.fetchone()
+    return c.fetchone()
+
+
+def find_similar_and_suffix(word: str, pos: str) -> Tuple[str, str]:
+    if suffix_trie:
+        result = suffix_trie.find(word, pos)
+    else:
+        result = _find_similar_and_suffix_sql(word, pos)
     if result:
         return result
     else:
@@ -42,12 +57,31 @@ def find_similar_and_suffix(word: str, pos: str) -> Tuple[str, str]:
 
 
 class SentenceTokenGenerator(SentenceTokenGeneratorBase):
+    cache_size: int = DEFAULT_CACHE_SIZE
+    cache_path: Optional[str] = None
+    _cache: Optional[LRUCache] = PrivateAttr(None)
+
+    @property
+    def cache(self) -> LRUCache:
+        if self._cache is None:
+            self._cache = LRUCache(
+                maxsize=self.cache_size,
+                path=self.cache_path,
+                table='generations'
+            )
+        return self._cache
+
+    def _generate_words(self, analysis: str) -> List[str]:
+        # failed generations are cached as empty lists, so they are not retried
+        return self.cache.get_or_set(
+            (self.lang, analysis),
+            lambda: [r[0] for r in uralicApi.generate(analysis, language=self.lang)]
+        )
 
     def _generate(self, analysis: str, similar_token: SentenceToken = None) -> Optional[str]:
-        results = uralicApi.generate(analysis, language=self.lang)
-        if not results:
+        words = self._generate_words(analysis)
+        if not words:
             return None
-        words = [r[0] for r in results]
         if similar_token:
             # return the word that ends most similarly to reference token
             return sorted(
@@ -0,0 +1,23 @@
+from collections import deque
+from concurrent.futures import Executor, Future
+from typing import Callable, Deque, Iterable, Iterator, TypeVar
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+def imap_ordered(
+    executor: Executor,
+    func: Callable[[T], R],
+    items: Iterable[T],
+    max_pending: int
+) -> Iterator[R]:
+    # like Executor.map, but consumes items lazily and keeps at most
+    # max_pending of them in flight
+    pending: Deque[Future] = deque()
+    for item in items:
+        pending.append(executor.submit(func, item))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
@@ -0,0 +1,62 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel
+from prophetnlg import Sentence, SentenceToken, WordAnalysis
+
+
+class WordAnalysisSchema(BaseModel):
+    text: str = ''
+    original: Optional[Any] = None
+    morphologies: Dict[str, float] = {}
+
+    class Config:
+        orm_mode = True
+
+    def to_object(self) -> WordAnalysis:
+        return WordAnalysis(text=self.text, original=self.original, morphologies=dict(self.morphologies))
+
+
+class SentenceTokenSchema(BaseModel):
+    text: str = ''
+    lang: str = ''
+    analyses: Dict[str, WordAnalysisSchema] = {}
+    spaces_after: str = ' '
+    cap: bool = False
+    passthrough: int = 0
+
+    class Config:
+        orm_mode = True
+
+    def to_object(self) -> SentenceToken:
+        return SentenceToken(
+            text=self.text,
+            lang=self.lang,
+            analyses={k: a.to_object() for k, a in self.analyses.items()},
+            spaces_after=self.spaces_after,
+            cap=self.cap,
+            passthrough=self.passthrough
+        )
+
+
+class SentenceSchema(BaseModel):
+    tokens: List[SentenceTokenSchema] = []
+    formatting: bool = False
+    passthrough: int = 0
+
+    class Config:
+        orm_mode = True
+
+    def to_object(self) -> Sentence:
+        return Sentence(
+            tokens=[t.to_object() for t in self.tokens],
+            formatting=self.formatting,
+            passthrough=self.passthrough
+        )
+
+
+def sentence_to_json(sentence: Sentence, **kwargs) -> str:
+    return SentenceSchema.from_orm(sentence).json(**kwargs)
+
+
+def sentence_from_json(data: str) -> Sentence:
+    return SentenceSchema.parse_raw(data).to_object()
@@ -90,6 +90,45 @@ class TestFinUDHeuristicAnalyzer(TestFinSentenceAnalyzer):
         self.assertEqual(sentences[8].tokens[3].lemma, 'määmä')
 
 
+class TestFinTypeDeduplication(unittest.TestCase):
+    def test_shared_type_analyses(self):
+        analyzer = FinHeuristicSentenceAnalyzer()
+        sentences = list(analyzer.analyze_sentences(analyzer.tokenizer.tokenize('Kissa istui. Kissa istui.')))
+        first, second = sentences[0].tokens[1], sentences[1].tokens[1]
+        self.assertIs(first.analyses['uralic'], second.analyses['uralic'])
+        self.assertEqual(first.analyses['semfi'], second.analyses['semfi'])
+
+
+class TestFinHeuristicMorphologyCache(unittest.TestCase):
+    def test_repeated_words(self):
+        analyzer = FinHeuristicSentenceAnalyzer()
+        text = 'Kissa istui. Kissa istui. Koira istui.'
+        sentences = list(analyzer.analyze_text(text))
+        self.assertEqual(
+            [t.morphology for t in sentences[0].tokens],
+            [t.morphology for t in sentences[1].tokens]
+        )
+        self.assertEqual(sentences[2].tokens[1].morphology, sentences[0].tokens[1].morphology)
+        self.assertGreaterEqual(analyzer.morphology_cache.stats.hits, 4)
+
+
+class TestFinHeuristicFusedAnalysis(unittest.TestCase):
+    def test_same_as_separate_passes(self):
+        text = 'Kissa hyppäsi katolle. Koira lurppasi sohvalla. Miten hän oli tietänyt?'
+        fused = list(FinHeuristicSentenceAnalyzer().analyze_text(text))
+        separate = list(FinHeuristicSentenceAnalyzer(fused=False).analyze_text(text))
+        self.assertEqual(fused, separate)
+
+    def test_input_tokens_unchanged(self):
+        analyzer = FinHeuristicSentenceAnalyzer()
+        sentences = list(analyzer.tokenizer.tokenize('Kissa istui. Kissa istui.'))
+        before = [dict(t.analyses) for s in sentences for t in s.tokens]
+        analyzed = list(analyzer.analyze_sentences(sentences))
+        self.assertEqual([t.analyses for s in sentences for t in s.tokens], before)
+        self.assertEqual(set(analyzed[0].tokens[0].analyses), {'cg', 'uralic', 'guess', 'semfi'})
+        self.assertIs(analyzed[0].tokens[0].analyses['uralic'], analyzed[1].tokens[0].analyses['uralic'])
+
+
 class TestFinAnalysisTense(unittest.TestCase):
     def setUp(self):
         self.analyzer = FinHeuristicSentenceAnalyzer()
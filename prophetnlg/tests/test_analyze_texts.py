@@ -0,0 +1,55 @@
+import os
+import unittest
+from prophetnlg import Sentence, WordAnalysis
+from prophetnlg.analysis.base import SentenceAnalyzerBase, TokenizerBase
+
+
+class SplitTokenizer(TokenizerBase):
+    def tokenize(self, text: str):
+        for line in text.split('.'):
+            if line.strip():
+                yield self.sentence_from_strings(line.split())
+
+
+class PidAnalyzer(SentenceAnalyzerBase):
+    tokenizer_class = SplitTokenizer
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.suffix = kwargs['suffix']
+
+    def analyze_token(self, token, **kwargs):
+        analysis = WordAnalysis(text=token.text, morphologies={f'{token.text}{self.suffix}': 0.0})
+        return token.with_analysis(analysis, 'pid').replace(lang=str(os.getpid()))
+
+
+class TestAnalyzeTexts(unittest.TestCase):
+    def test_analyze_texts(self):
+        analyzer = PidAnalyzer(lang='fin', suffix='+N')
+        texts = [f'sana{i} toinen. kolmas{i}.' for i in range(50)]
+        serial = list(analyzer.analyze_texts(texts))
+        parallel = list(analyzer.analyze_texts(iter(texts), workers=2, chunk_size=3))
+
+        self.assertEqual(len(parallel), 50)
+        self.assertTrue(all(isinstance(s, Sentence) for sentences in parallel for s in sentences))
+        strip = lambda results: [
+            [[(t.text, t.analyses['pid'].get_morphologies()) for t in s.tokens] for s in sentences]
+            for sentences in results
+        ]
+        self.assertEqual(strip(parallel), strip(serial))
+        self.assertEqual(strip(parallel)[7], [[('sana7', {'sana7+N'}), ('toinen', {'toinen+N'})], [('kolmas7', {'kolmas7+N'})]])
+        pids = {t.lang for sentences in parallel for s in sentences for t in s.tokens}
+        self.assertNotIn(str(os.getpid()), pids)
+
+    def test_sentence_chunks(self):
+        analyzer = PidAnalyzer(lang='fin', suffix='+N')
+        long_text = '. '.join(f'sana{i}' for i in range(200))
+        texts = ['', long_text, 'lyhyt.', '']
+        serial = list(analyzer.analyze_texts(texts))
+        parallel = list(analyzer.analyze_texts(texts, workers=2, chunk_size=4))
+        strip = lambda results: [[[t.text for t in s.tokens] for s in sentences] for sentences in results]
+        self.assertEqual(strip(parallel), strip(serial))
+        self.assertEqual([len(sentences) for sentences in parallel], [0, 200, 1, 0])
+        # the sentences of one text are analyzed by several workers
+        pids = {t.lang for s in parallel[1] for t in s.tokens}
+        self.assertGreater(len(pids), 1)
@@ -0,0 +1,76 @@
+import unittest
+import numpy as np
+from prophetnlg import Sentence, SentenceToken
+from prophetnlg.batch import SentenceBatch, Vocabulary
+
+
+def get_sentences():
+    tokens = [
+        SentenceToken(text='Pöllöt', cap=True).with_morphologies(['pöllö+N+Pl+Nom'], 'guess'),
+        SentenceToken(text='miettivät').with_morphologies(['miettiä+V+Act+Ind+Prs+Pl3'], 'guess'),
+        SentenceToken(text='.', spaces_after='\n').with_morphologies(['.+Punct'], 'guess'),
+    ]
+    return [
+        Sentence(tokens=tokens, formatting=True),
+        Sentence(),
+        Sentence(tokens=tokens[:2], passthrough=1),
+    ]
+
+
+class TestSentenceBatch(unittest.TestCase):
+    def test_roundtrip(self):
+        sentences = get_sentences()
+        batch = SentenceBatch.from_sentences(sentences, vocabulary=Vocabulary())
+        self.assertEqual(len(batch), 3)
+        self.assertEqual(batch.n_tokens, 5)
+        self.assertEqual(batch.to_sentences(), sentences)
+        self.assertEqual(batch.token_text(1), 'miettivät')
+        self.assertEqual(list(batch.sentence_ids), [0, 0, 0, 2, 2])
+
+    def test_interned_columns(self):
+        batch = SentenceBatch.from_sentences(get_sentences(), vocabulary=Vocabulary())
+        pos = [batch.vocabulary[i] for i in batch.pos_ids]
+        self.assertEqual(pos, ['N', 'V', 'Punct', 'N', 'V'])
+        self.assertEqual(batch.pos_ids[0], batch.pos_ids[3])
+        table = batch.vocabulary.lookup_table({'N': 0.5, 'V': 0.25})
+        self.assertEqual(list(table[batch.pos_ids]), [0.5, 0.25, 0.0, 0.5, 0.25])
+
+    def test_lookup_table_cache(self):
+        vocabulary = Vocabulary(['', 'N'])
+        effects = {'N': 0.5, 'V': 0.25}
+        table = vocabulary.lookup_table(effects)
+        self.assertEqual(list(table), [0.0, 0.5])
+        self.assertFalse(table.flags.writeable)
+        # the table is reused and extended with the new strings only
+        v_id = vocabulary.intern('V')
+        grown = vocabulary.lookup_table(dict(reversed(effects.items())))
+        self.assertTrue(np.shares_memory(grown, vocabulary.lookup_table(effects)))
+        self.assertEqual(list(grown), [0.0, 0.5, 0.25])
+        self.assertEqual(list(table), [0.0, 0.5])
+        self.assertEqual(list(vocabulary.lookup_table(effects, default=-1.0)), [-1.0, 0.5, 0.25])
+        for i in range(100):
+            vocabulary.intern(str(i))
+        self.assertEqual(vocabulary.lookup_table(effects)[v_id], 0.25)
+        self.assertEqual(len(vocabulary.lookup_table(effects)), len(vocabulary))
+
+    def test_replace_columns(self):
+        sentences = get_sentences()
+        batch = SentenceBatch.from_sentences(sentences)
+        new_batch = batch.replace(passthrough=np.where(batch.pos_ids == batch.pos_ids[0], 1, 0))
+        new_sentences = new_batch.to_sentences()
+        self.assertEqual([t.passthrough for t in new_sentences[0].tokens], [1, 0, 0])
+        # unchanged tokens are not copied, and the source batch is intact
+        self.assertIs(new_sentences[0].tokens[1], sentences[0].tokens[1])
+        self.assertEqual(batch.to_sentences(), sentences)
+
+    def test_from_stream(self):
+        sentences = get_sentences() * 3
+        batches = list(SentenceBatch.from_stream(iter(sentences), 4))
+        self.assertEqual([len(b) for b in batches], [4, 4, 1])
+        self.assertTrue(all(b.vocabulary is batches[0].vocabulary for b in batches))
+        self.assertEqual([s for b in batches for s in b.to_sentences()], sentences)
+        self.assertEqual(batches[0].pos_ids[0], batches[1].pos_ids[0])
+        # batches of other streams get vocabularies of their own
+        other = next(SentenceBatch.from_stream(sentences, 4))
+        self.assertIsNot(other.vocabulary, batches[0].vocabulary)
+        self.assertIsNot(SentenceBatch.from_sentences(sentences).vocabulary, other.vocabulary)
@@ -0,0 +1,95 @@
+import os
+import pickle
+import tempfile
+import unittest
+from prophetnlg.cache.disk import TextDiskCache
+from prophetnlg.cache.lru import LRUCache
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_eviction(self):
+        cache = LRUCache(maxsize=2)
+        cache['a'] = 1
+        cache['b'] = 2
+        self.assertEqual(cache.get('a'), 1)
+        cache['c'] = 3
+        # 'b' was least recently used
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(len(cache), 2)
+
+    def test_stats(self):
+        cache = LRUCache(maxsize=10)
+        calls = []
+        for word in ['kissa', 'koira', 'kissa', 'kissa']:
+            cache.get_or_set(('fin', word), lambda: calls.append(word) or [word])
+        self.assertEqual(calls, ['kissa', 'koira'])
+        self.assertEqual(cache.stats.hits, 2)
+        self.assertEqual(cache.stats.misses, 2)
+        self.assertEqual(cache.stats.hit_rate, 0.5)
+
+    def test_persistent(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'cache.db')
+            cache = LRUCache(maxsize=10, path=path)
+            cache[('fin', 'kissa')] = ['kissa+N+Sg+Nom']
+            cache.close()
+
+            cache = LRUCache(maxsize=10, path=path)
+            self.assertEqual(cache.get(('fin', 'kissa')), ['kissa+N+Sg+Nom'])
+            self.assertEqual(cache.stats.disk_hits, 1)
+            cache.close()
+
+    def test_pickle(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = LRUCache(maxsize=10, path=os.path.join(tmp, 'cache.db'))
+            cache.get_or_set(('fin', 'kissa'), lambda: ['kissa+N+Sg+Nom'])
+            copy = pickle.loads(pickle.dumps(cache))
+            self.assertIsNot(copy.lock, cache.lock)
+            self.assertEqual(copy.get(('fin', 'kissa')), ['kissa+N+Sg+Nom'])
+            # the copy has its own connection to the same store
+            copy[('fin', 'koira')] = ['koira+N+Sg+Nom']
+            copy.close()
+            cache.clear()
+            self.assertEqual(cache.get(('fin', 'koira')), ['koira+N+Sg+Nom'])
+            cache.close()
+            self.assertIsNone(pickle.loads(pickle.dumps(cache)).store)
+
+
+class TestTextDiskCache(unittest.TestCase):
+    def test_get_set(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = TextDiskCache(tmp)
+            key = TextDiskCache.make_key('fi_tdt', 'Kissa juoksi.')
+            self.assertNotEqual(key, TextDiskCache.make_key('fi_tdt', 'Kissa juoksi'))
+            self.assertIsNone(cache.get(key))
+            cache[key] = '1\tKissa\n'
+            self.assertEqual(TextDiskCache(tmp).get(key), '1\tKissa\n')
+            self.assertEqual(cache.stats.misses, 1)
+
+    def test_overwrite(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = TextDiskCache(tmp, max_size=250)
+            key = TextDiskCache.make_key('a')
+            for i in range(10):
+                cache[key] = 'x' * 100
+            self.assertEqual(cache.size, 100)
+            cache[key] = 'x' * 50
+            self.assertEqual(cache.size, 50)
+            cache[TextDiskCache.make_key('b')] = 'x' * 100
+            self.assertEqual(cache.evictions, 0)
+            self.assertEqual(cache.get(key), 'x' * 50)
+            self.assertEqual(cache.size, TextDiskCache(tmp).size)
+
+    def test_eviction(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = TextDiskCache(tmp, max_size=250)
+            keys = [TextDiskCache.make_key(str(i)) for i in range(3)]
+            for i, key in enumerate(keys):
+                cache[key] = 'x' * 100
+                os.utime(cache._file(key), (i, i))
+            # the oldest is removed to get under 90% of max_size
+            self.assertEqual(cache.evictions, 1)
+            self.assertEqual([cache.get(k) is not None for k in keys], [False, True, True])
+            self.assertEqual(TextDiskCache(tmp).size, 200)
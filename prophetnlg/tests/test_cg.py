@@ -0,0 +1,61 @@
+import unittest
+from unittest import mock
+from uralicNLP import cg3
+from prophetnlg import Sentence, SentenceToken
+from prophetnlg.analysis.cg import SENTENCE_BOUNDARY, CGSentenceAnalyzer
+
+
+class StubCGSentenceAnalyzer(CGSentenceAnalyzer):
+    # tags every word with the number of the CG run it was in
+    def __init__(self, **kwargs):
+        with mock.patch('prophetnlg.analysis.cg.cg3.Cg3'):
+            super().__init__(lang='fin', language='finnish', **kwargs)
+        self.calls = []
+
+    def _cg_disambiguate(self, words):
+        self.calls.append(list(words))
+        run = str(len(self.calls))
+        return [(w, [cg3.Cg3Word(w, w.lower(), ['N', run])]) for w in words]
+
+
+class TestCGSentenceAnalyzer(unittest.TestCase):
+    def test_disambiguate_sentences(self):
+        analyzer = StubCGSentenceAnalyzer()
+        sentences = [['Kissa', 'istui', '.'], [], ['Koira', '.']]
+        results = analyzer.disambiguate_sentences(iter(sentences))
+        # one CG run, split back at the boundaries
+        self.assertEqual(analyzer.calls, [['Kissa', 'istui', '.', '¶', '¶', 'Koira', '.', '¶']])
+        self.assertEqual([[t[0] for t in r] for r in results], sentences)
+        self.assertEqual(results[2][0][1][0].morphology, ['N', '1'])
+
+    def test_boundary_in_sentence(self):
+        analyzer = StubCGSentenceAnalyzer()
+        sentences = [['Kissa', '.'], ['a', SENTENCE_BOUNDARY, 'b']]
+        results = analyzer.disambiguate_sentences(sentences)
+        # the sentences are disambiguated one by one
+        self.assertEqual(analyzer.calls, sentences)
+        self.assertEqual([[t[0] for t in r] for r in results], sentences)
+
+    def test_fallback(self):
+        analyzer = StubCGSentenceAnalyzer()
+        disambiguate = analyzer._cg_disambiguate
+
+        # a CG that drops the boundaries
+        def drop_boundaries(words):
+            return [t for t in disambiguate(words) if t[0] != SENTENCE_BOUNDARY]
+
+        analyzer._cg_disambiguate = drop_boundaries
+        sentences = [['Kissa', '.'], ['Koira', '.']]
+        results = analyzer.disambiguate_sentences(sentences)
+        self.assertEqual(analyzer.calls[1:], sentences)
+        self.assertEqual([[t[0] for t in r] for r in results], sentences)
+        self.assertEqual([r[0][1][0].morphology for r in results], [['N', '2'], ['N', '3']])
+
+    def test_analyze_sentences(self):
+        analyzer = StubCGSentenceAnalyzer(batch_size=2)
+        sentences = [Sentence(tokens=[SentenceToken(text=w) for w in ['Kissa', str(i)]]) for i in range(5)]
+        analyzed = list(analyzer.analyze_sentences(sentences))
+        self.assertEqual(len(analyzer.calls), 3)
+        morphologies = [s.tokens[0].analyses['cg'].get_morphologies() for s in analyzed]
+        self.assertEqual(morphologies, [{'kissa+N+1'}] * 2 + [{'kissa+N+2'}] * 2 + [{'kissa+N+3'}])
+        self.assertEqual([s.tokens[1].text for s in analyzed], [str(i) for i in range(5)])
@@ -0,0 +1,139 @@
+import os
+from pathlib import Path
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+from uralicNLP import cg3
+from prophetnlg.analysis.cgpool import (
+    FLUSH_COMMAND,
+    CGWorker,
+    CGWorkerError,
+    CGWorkerPool,
+    cg_conv,
+    hfst_input,
+    parse_cg_results
+)
+
+# echoes its input like a grammar without rules, FAKE_CG_FAIL makes the
+# first process that sees a flush crash or hang, or stop reading at once
+FAKE_VISLCG3 = f'''#!{sys.executable}
+import os, sys, time
+fail = os.environ.get('FAKE_CG_FAIL')
+state = os.environ.get('FAKE_CG_STATE')
+if fail == 'block' and not os.path.exists(state):
+    open(state, 'w').close()
+    time.sleep(60)
+for line in sys.stdin:
+    if line.startswith({FLUSH_COMMAND!r}):
+        if fail and not os.path.exists(state):
+            open(state, 'w').close()
+            if fail == 'crash':
+                sys.exit(1)
+            time.sleep(60)
+        sys.stdout.write(line)
+        sys.stdout.flush()
+    else:
+        sys.stdout.write(line)
+'''
+
+HFST = 'Pöllöt\tpöllö+N+Pl+Nom\t0.0\n\nmiettivät\tmiettiä+V+Act+Ind+Prs+Pl3\t0.0\n\n\t+?\tinf\n'
+CG_INPUT = '"<Pöllöt>"\n\t"pöllö" N Pl Nom <W:0.000000>\n"<miettivät>"\n\t"miettiä" V Act Ind Prs Pl3 <W:0.000000>\n"<>"\n\t"" ? <W:inf>\n'
+
+
+class TestCGWorkerPool(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        bin_dir = Path(self.tmp.name)
+        path = bin_dir / 'vislcg3'
+        path.write_text(FAKE_VISLCG3)
+        path.chmod(0o755)
+        env = {
+            'PATH': f'{bin_dir}{os.pathsep}{os.environ["PATH"]}',
+            'FAKE_CG_STATE': str(bin_dir / 'failed'),
+        }
+        patcher = mock.patch.dict(os.environ, env)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def get_pool(self, **kwargs) -> CGWorkerPool:
+        pool = CGWorkerPool('fin', grammar_path='fake.cg3', **kwargs)
+        self.addCleanup(pool.close)
+        return pool
+
+    def assert_parsed(self, tokens):
+        self.assertEqual([t[0] for t in tokens], ['Pöllöt', 'miettivät'])
+        self.assertEqual(tokens[0][1][0].lemma, 'pöllö')
+        self.assertEqual(tokens[1][1][0].morphology, ['V', 'Act', 'Ind', 'Prs', 'Pl3', '<W:0.000000>'])
+
+    def test_flush_framing(self):
+        worker = CGWorker('fake.cg3', timeout=5)
+        self.addCleanup(worker.stop)
+        self.assertEqual(worker.run('"<a>"\n\t"a" N'), '"<a>"\n\t"a" N')
+        # each request only gets its own output
+        self.assertEqual(worker.run('"<b>"'), '"<b>"')
+
+    def test_disambiguate(self):
+        pool = self.get_pool(size=2)
+        for i in range(3):
+            self.assert_parsed(pool.disambiguate_hfst(HFST))
+
+    def test_crash_restart(self):
+        os.environ['FAKE_CG_FAIL'] = 'crash'
+        pool = self.get_pool(timeout=5)
+        self.assert_parsed(pool.disambiguate_hfst(HFST))
+        self.assertTrue(os.path.exists(os.environ['FAKE_CG_STATE']))
+
+    def test_timeout_restart(self):
+        os.environ['FAKE_CG_FAIL'] = 'hang'
+        pool = self.get_pool(timeout=0.5)
+        self.assert_parsed(pool.disambiguate_hfst(HFST))
+
+    def test_blocked_input(self):
+        # more input than fits in the pipe to a process that doesn't read
+        os.environ['FAKE_CG_FAIL'] = 'block'
+        pool = self.get_pool(timeout=1)
+        tokens = pool.disambiguate_hfst(HFST * 2000)
+        self.assert_parsed(tokens[:2])
+        # the last cohort is dropped by the parser
+        self.assertEqual(len(tokens), 3 * 2000 - 1)
+
+    def test_no_process_per_call(self):
+        pool = self.get_pool()
+        with mock.patch('prophetnlg.analysis.cgpool.subprocess') as subprocess:
+            self.assert_parsed(pool.disambiguate_hfst(HFST))
+        self.assertEqual(subprocess.mock_calls, [])
+
+    def test_retries_exhausted(self):
+        os.environ['FAKE_CG_FAIL'] = 'hang'
+        pool = self.get_pool(timeout=0.5, retries=0)
+        with self.assertRaises(CGWorkerError):
+            pool.disambiguate_hfst(HFST)
+        # the restarted worker is back in the pool
+        self.assert_parsed(pool.disambiguate_hfst(HFST))
+
+    def test_hfst_input(self):
+        analyses = {'Pöllöt': [('pöllö+N+Pl+Nom', 0.0)], 'miettivät': [('miettiä+V+Act+Ind+Prs+Pl3', 0.0)]}
+        with mock.patch('prophetnlg.analysis.cgpool.uralicApi.analyze', lambda w, l: analyses.get(w, [])):
+            self.assertEqual(hfst_input(['Pöllöt', 'miettivät', ''], 'fin'), HFST)
+
+    def test_cg_conv(self):
+        self.assertEqual(cg_conv(HFST), CG_INPUT)
+        self.assertEqual(cg_conv(''), '')
+
+    @unittest.skipUnless(shutil.which('cg-conv'), 'cg-conv is not installed')
+    def test_cg_conv_parity(self):
+        hfst = HFST + 'kissa\tkissa+N+Sg+Nom\t1.5\nkissa\tkissa+N+Prop+Sg+Nom\t2.0\n\n'
+        output = subprocess.run(['cg-conv', '-f'], input=hfst, stdout=subprocess.PIPE, encoding='utf-8', check=True).stdout
+        strip = lambda tokens: [(t[0], [(w.lemma, w.morphology) for w in t[1]]) for t in tokens]
+        self.assertEqual(strip(parse_cg_results(cg_conv(hfst))), strip(parse_cg_results(output)))
+
+    def test_parse_cg_results(self):
+        output = '"<a>"\n\t"a" N Sg\n\t"a" V\n"<b+c>"\n\t"b+c" ?\n\t; "b" N <W:1.5>\n"<>"\n'
+        strip = lambda tokens: [(t[0], [(w.form, w.lemma, w.morphology) for w in t[1]]) for t in tokens]
+        self.assertEqual(strip(parse_cg_results(output))[0], ('a', [('a', 'a', ['N', 'Sg']), ('a', 'a', ['V'])]))
+        # same as the parser of Cg3.disambiguate
+        self.assertEqual(strip(parse_cg_results(output)), strip(cg3.Cg3._Cg3__parse_cg_results(None, output)))
@@ -0,0 +1,80 @@
+import io
+import os
+import tempfile
+import unittest
+from prophetnlg.analysis.conllu import read_conllu, write_conllu
+from prophetnlg.analysis.ud import UDTokenizer
+
+CONLLU = '''# newdoc
+# text = Kissat eivät juokse.
+1\tKissat\tkissa\tNOUN\t_\tCase=Nom|Number=Plur\t3\tnsubj\t_\t_
+2-3\teivät\t_\t_\t_\t_\t_\t_\t_\t_
+2\teivät\tei\tAUX\t_\tNumber=Plur|Person=3|Polarity=Neg|VerbForm=Fin|Voice=Act\t3\taux\t_\t_
+3\tjuokse\tjuosta\tVERB\t_\tConnegative=Yes|Mood=Ind|Tense=Pres|VerbForm=Fin\t0\troot\t_\tSpaceAfter=No
+3.1\tjuokse\tjuosta\tVERB\t_\t_\t_\t_\t3:conj\t_
+4\t.\t.\tPUNCT\t_\t_\t3\tpunct\t_\tSpacesAfter=\\n
+
+1\tHello\thello\tX\t_\tForeign=Yes\t0\troot\t_\tSpaceAfter=No
+2\t!\t!\tPUNCT\t_\t_\t1\tpunct\t_\t_
+
+'''
+
+
+class TestCoNLLU(unittest.TestCase):
+    def test_read_like_tokenizer(self):
+        tokenizer = UDTokenizer(lang='fin', language='finnish')
+        expected = tokenizer._parse_conllu(CONLLU)
+        sentences = list(read_conllu(io.StringIO(CONLLU)))
+        strip = lambda sentences: [
+            [(t.text, t.lang, t.spaces_after, t.analyses['ud'].morphologies) for t in s.tokens]
+            for s in sentences
+        ]
+        self.assertEqual(strip(sentences), strip(expected))
+        self.assertEqual([s.as_text() for s in sentences], ['Kissat eivät juokse.', 'Hello!'])
+        self.assertEqual(sentences[1].tokens[0].lang, '?')
+
+    def test_read_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'corpus.conllu')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(CONLLU * 3)
+            for use_mmap in (False, True):
+                sentences = read_conllu(path, use_mmap=use_mmap)
+                self.assertEqual(len(list(sentences)), 6)
+            with open(path, 'rb') as f:
+                self.assertEqual(len(list(read_conllu(f))), 6)
+
+    def test_write(self):
+        sentences = [
+            s.replace(tokens=[t.with_analysis(t.analyses['ud'], 'guess') for t in s.tokens])
+            for s in read_conllu(io.StringIO(CONLLU))
+        ]
+        out = io.StringIO()
+        self.assertEqual(write_conllu(sentences, out), 2)
+        lines = out.getvalue().split('\n')
+        self.assertEqual(lines[:3], [
+            '# sent_id = 1',
+            '# text = Kissat eivät juokse.',
+            '1\tKissat\tkissa\t_\tN+Pl+Nom\t_\t_\t_\t_\t_',
+        ])
+        self.assertEqual(lines[4], '3\tjuokse\tjuosta\t_\tV+Act+Prs+ConNeg\t_\t_\t_\t_\tSpaceAfter=No')
+        reread = list(read_conllu(io.StringIO(out.getvalue())))
+        self.assertEqual([s.as_text() for s in reread], [s.as_text() for s in sentences])
+        self.assertEqual(
+            [[t.analyses['ud'].lemma for t in s.tokens] for s in reread],
+            [['kissa', 'ei', 'juosta', '.'], ['hello', '!']]
+        )
+
+    def test_write_internal_newline(self):
+        text = '1\tOtsikko\totsikko\tNOUN\t_\t_\t0\troot\t_\tSpacesAfter=\\n\\n\n2\tKissa\tkissa\tNOUN\t_\t_\t1\tdep\t_\t_\n\n'
+        sentences = list(read_conllu(io.StringIO(text)))
+        self.assertEqual(sentences[0].tokens[0].spaces_after, '\n\n')
+        out = io.StringIO()
+        write_conllu(sentences, out)
+        lines = out.getvalue().split('\n')
+        self.assertEqual(lines[1], '# text = Otsikko  Kissa')
+        self.assertEqual(lines[2], '1\tOtsikko\t_\t_\t_\t_\t_\t_\t_\tSpacesAfter=\\n\\n')
+        reread = list(read_conllu(io.StringIO(out.getvalue())))
+        self.assertEqual(len(reread), 1)
+        strip = lambda sentence: [(t.text, t.spaces_after) for t in sentence.tokens]
+        self.assertEqual(strip(reread[0]), strip(sentences[0]))
@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+from collections import Counter
+from itertools import islice
+from prophetnlg.cache.arrays import save_arrays
+from prophetnlg.cache.frequency import FrequencyIndex, FrequencySampler, build_arrays
+
+ROWS = [
+    ('N', 'kissa_N', 'kissa', 100.0),
+    ('V', 'juosta_V', 'juosta', 90.0),
+    ('N', 'koira_N', 'koira', 50.0),
+    ('A', 'kaunis_A', 'kaunis', 10.0),
+    ('N', 'aasi_N', 'aasi', 3.0),
+]
+
+
+class TestFrequencyIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp.name, 'semfi.index')
+        save_arrays(path, build_arrays(ROWS))
+        self.index = FrequencyIndex.load(path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_most_common(self):
+        self.assertEqual(self.index.get_most_common('N', 2), ['kissa', 'koira'])
+        self.assertEqual(self.index.get_most_common('N', 10), ['kissa', 'koira', 'aasi'])
+        self.assertEqual(self.index.get_most_common('Adv'), [])
+
+    def test_random(self):
+        words = self.index.get_random('N', 2)
+        self.assertEqual(len(set(words)), 2)
+        self.assertTrue(set(words) <= {'kissa', 'koira', 'aasi'})
+
+    def test_frequencies(self):
+        frequencies = self.index.get_frequencies([('koira', 'N'), ('juosta', 'V'), ('kissa', 'V'), ('mursu', 'N')])
+        self.assertEqual(frequencies, {'koira': 50.0, 'juosta': 90.0})
+
+    def test_sampler(self):
+        sampler = FrequencySampler(self.index, seed=1)
+        counts = Counter(sampler.sample('N', 15300))
+        self.assertEqual(set(counts), {'kissa', 'koira', 'aasi'})
+        self.assertAlmostEqual(counts['kissa'] / counts['koira'], 2.0, delta=0.2)
+        self.assertEqual(sampler.sample('Adv', 10), [])
+
+        same = FrequencySampler(self.index, seed=1)
+        self.assertEqual(same.sample('N', 100), FrequencySampler(self.index, seed=1).sample('N', 100))
+
+    def test_sampler_temperature_and_floor(self):
+        sampler = FrequencySampler(self.index, temperature=1000.0, min_frequency=10.0, seed=2)
+        counts = Counter(sampler.sample('N', 10000))
+        self.assertEqual(set(counts), {'kissa', 'koira'})
+        self.assertAlmostEqual(counts['kissa'] / counts['koira'], 1.0, delta=0.1)
+
+    def test_sampler_stream(self):
+        streams = FrequencySampler(self.index, seed=3).streams(['A', 'Adv'], batch_size=4)
+        self.assertEqual(list(islice(streams['A'], 10)), ['kaunis'] * 10)
+        self.assertEqual(list(streams['Adv']), [])
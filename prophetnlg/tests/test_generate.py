@@ -1,4 +1,8 @@
+import os
+import pickle
+import tempfile
 import unittest
+from unittest import mock
 from prophetnlg.analysis.fin import FinHeuristicSentenceAnalyzer
 from prophetnlg.generator.fin import SentenceTokenGenerator
 
@@ -59,3 +63,49 @@ class TestFinVerbGenerator(unittest.TestCase):
         new_word = self.generator.token_with_new_lemma(token, 'huheltaa').text
         self.assertEqual(new_word, 'huhelsimme')
 
+
+
+class TestGeneratorCache(unittest.TestCase):
+    def generate(self, analysis, language):
+        self.calls.append(analysis)
+        return {'vuosi+N+Pl+Par': [('vuosia', 0.0)]}.get(analysis, [])
+
+    def setUp(self):
+        self.calls = []
+        patcher = mock.patch('prophetnlg.generator.fin.uralicApi.generate', self.generate)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_cache(self):
+        generator = SentenceTokenGenerator()
+        for i in range(2):
+            self.assertEqual(generator._generate('vuosi+N+Pl+Par'), 'vuosia')
+            # failed generations are cached too
+            self.assertIsNone(generator._generate('xyz+N+Pl+Par'))
+        self.assertEqual(self.calls, ['vuosi+N+Pl+Par', 'xyz+N+Pl+Par'])
+        self.assertEqual((generator.cache.stats.hits, generator.cache.stats.misses), (2, 2))
+        self.assertEqual(generator.cache.get(('fin', 'xyz+N+Pl+Par')), [])
+
+    def test_persistent_cache(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'generations.db')
+            generator = SentenceTokenGenerator(cache_path=path)
+            generator._generate('vuosi+N+Pl+Par')
+            generator._generate('xyz+N+Pl+Par')
+            generator.cache.close()
+
+            generator = SentenceTokenGenerator(cache_path=path)
+            self.assertEqual(generator._generate('vuosi+N+Pl+Par'), 'vuosia')
+            self.assertIsNone(generator._generate('xyz+N+Pl+Par'))
+            self.assertEqual(len(self.calls), 2)
+            self.assertEqual(generator.cache.stats.disk_hits, 2)
+            # the tuple keys are found again, values come back as lists
+            self.assertEqual(generator.cache.get(('fin', 'vuosi+N+Pl+Par')), ['vuosia'])
+            generator.cache.close()
+
+    def test_pickle_used_generator(self):
+        generator = SentenceTokenGenerator()
+        self.assertEqual(generator._generate('vuosi+N+Pl+Par'), 'vuosia')
+        # the cache holds a lock after use, process pools pickle the generator
+        copy = pickle.loads(pickle.dumps(generator))
+        self.assertEqual(copy.cache.get(('fin', 'vuosi+N+Pl+Par')), ['vuosia'])
@@ -0,0 +1,62 @@
+import pickle
+import unittest
+from prophetnlg import Sentence, SentenceToken, WordAnalysis, parse_morphology
+from prophetnlg.schema import sentence_from_json, sentence_to_json
+
+
+def get_sentence() -> Sentence:
+    tokens = [
+        SentenceToken(text='Kissa', cap=True).with_morphologies(['kissa+N+Sg+Nom'], 'guess'),
+        SentenceToken(text='hyppäsi', spaces_after='').with_morphologies(['hypätä+V+Act+Ind+Prt+Sg3'], 'guess'),
+        SentenceToken(text='.', spaces_after='').with_morphologies(['.+Punct'], 'guess'),
+    ]
+    return Sentence(tokens=tokens, formatting=True)
+
+
+class TestTokenModel(unittest.TestCase):
+    def test_replace(self):
+        token = SentenceToken(text='kissa')
+        new_token = token.replace(passthrough=1)
+        self.assertEqual(new_token.passthrough, 1)
+        self.assertEqual(new_token.text, 'kissa')
+        # no side-effects on the original
+        self.assertEqual(token.passthrough, 0)
+        with self.assertRaises(AttributeError):
+            token.replace(unknown=1)
+
+    def test_defaults_not_shared(self):
+        a, b = SentenceToken(), SentenceToken()
+        a.analyses['guess'] = WordAnalysis()
+        self.assertEqual(b.analyses, {})
+
+    def test_equality(self):
+        self.assertEqual(Sentence(), Sentence())
+        self.assertEqual(get_sentence(), get_sentence())
+        self.assertNotEqual(get_sentence(), Sentence())
+
+    def test_properties(self):
+        sentence = get_sentence()
+        self.assertEqual([t.pos for t in sentence.tokens], ['N', 'V', 'Punct'])
+        self.assertEqual(sentence.tokens[1].lemma, 'hypätä')
+        self.assertEqual(sentence.as_text(), 'Kissa hyppäsi.')
+
+    def test_serialization(self):
+        sentence = get_sentence()
+        self.assertEqual(sentence_from_json(sentence_to_json(sentence)), sentence)
+        self.assertEqual(pickle.loads(pickle.dumps(sentence)), sentence)
+
+    def test_parsed_morphologies(self):
+        analysis = WordAnalysis(morphologies={'kissa+N+Sg+Nom': 0.0, 'Kissa+N+Prop+Sg+Nom': 0.0, '?': 0.0})
+        self.assertEqual(analysis.get_lemmas(), {'kissa', 'Kissa'})
+        self.assertEqual(analysis.get_pos(), {'N'})
+        self.assertEqual(analysis.pos, 'N')
+        self.assertEqual(analysis.lemma, '')
+        parsed = analysis.parsed_morphologies
+        self.assertEqual({m.tags for m in parsed}, {('Sg', 'Nom'), ('Prop', 'Sg', 'Nom')})
+        # identical morphology strings share one parsed object
+        self.assertIs(parse_morphology('kissa+N+Sg+Nom'), parse_morphology('kissa+N+Sg+Nom'))
+
+        # derived values are not carried over to a replaced analysis
+        new_analysis = analysis.replace(morphologies={'koira+N+Sg+Nom': 0.0})
+        self.assertEqual(new_analysis.lemma, 'koira')
+        self.assertEqual(analysis.get_lemmas(), {'kissa', 'Kissa'})
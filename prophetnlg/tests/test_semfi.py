@@ -0,0 +1,72 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+from prophetnlg.datasets.semfi import SemFiSQL
+
+
+def get_rows(n: int):
+    # runs of nouns between single verbs and adjectives, so the noun rowids
+    # are not consecutive
+    for i in range(n):
+        pos = 'V' if i % 7 == 3 else 'A' if i % 11 == 5 else 'N'
+        yield f'sana{i}_{pos}', f'sana{i}', pos, float(n - i)
+
+
+class TestSemFiSQL(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        path = os.path.join(self.tmp.name, 'sem.db')
+        conn = sqlite3.connect(path)
+        conn.execute('CREATE TABLE words (id TEXT PRIMARY KEY, word TEXT, pos TEXT, frequency REAL)')
+        self.rows = list(get_rows(2000))
+        conn.executemany('INSERT INTO words VALUES (?, ?, ?, ?)', self.rows)
+        conn.commit()
+        conn.close()
+        self.path = path
+        self.semfi = SemFiSQL(db_filename=path)
+        self.addCleanup(self.semfi.close)
+
+    def test_default_path(self):
+        with mock.patch('prophetnlg.datasets.semfi.where_semfi', return_value=self.path) as where_semfi:
+            semfi = SemFiSQL()
+        self.addCleanup(semfi.close)
+        where_semfi.assert_called_once_with('fin')
+        self.assertEqual(semfi.get_most_common('V'), ['sana3'])
+
+    def words(self, pos: str):
+        return {word for _, word, p, _ in self.rows if p == pos}
+
+    def test_most_common(self):
+        self.assertEqual(self.semfi.get_most_common('V', 2), ['sana3', 'sana10'])
+
+    def test_frequencies(self):
+        # more ids than fit in one query, duplicates and missing ones
+        lemmas_pos = [(f'sana{i}', 'N') for i in range(2000)] + [('sana0', 'N'), ('sana3', 'N'), ('mursu', 'N')]
+        frequencies = self.semfi.get_frequencies(lemmas_pos)
+        expected = {word: frequency for _, word, pos, frequency in self.rows if pos == 'N'}
+        self.assertGreater(len(expected), self.semfi.max_variables)
+        self.assertEqual(frequencies, expected)
+        self.assertEqual(self.semfi.get_frequencies([]), {})
+
+    def test_rowid_ranges(self):
+        starts, before, count = self.semfi._get_rowid_ranges('V')
+        # every 7th row from rowid 4 is a verb, each a run of its own
+        self.assertEqual(count, len(self.words('V')))
+        self.assertEqual(list(starts[:3]), [4, 11, 18])
+        self.assertEqual(list(before[:3]), [0, 1, 2])
+        self.assertEqual(self.semfi._get_rowid_ranges('Adv')[2], 0)
+
+    def test_random(self):
+        for pos in ('N', 'V', 'A'):
+            words = self.semfi.get_random(pos, 50)
+            self.assertEqual(len(set(words)), 50)
+            self.assertLessEqual(set(words), self.words(pos))
+        # sampling all rows maps every row to its own rowid, in more queries
+        # than one
+        words = self.semfi.get_random('N', 5000)
+        self.assertEqual(len(words), len(self.words('N')))
+        self.assertEqual(set(words), self.words('N'))
+        self.assertEqual(self.semfi.get_random('Adv', 5), [])
@@ -0,0 +1,83 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+from pathlib import Path
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+from prophetnlg.cache.suffix import build
+
+SOURCE_ROWS = [
+    ('kissa', 'N', 100.0),
+    ('koti|kissa', 'N', 50.0),
+    ('aasi', 'N', 40.0),
+    ('xyzzy', 'N', 30.0),
+    ('juosta', 'V', 90.0),
+    ('harvinainen', 'N', 1.0),
+    ('nopea', 'A', 20.0),
+    ('nopeasti', 'Adv', 20.0),
+]
+
+
+class TestSuffixBuild(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.source_path = os.path.join(tmp.name, 'sem.db')
+        self.target_path = Path(tmp.name) / 'cache.db'
+        self.add_source_rows(SOURCE_ROWS)
+        self.analyzed = []
+        # analyze_words runs in threads here, so the stub sees the calls
+        for target, new in (('ProcessPoolExecutor', ThreadPoolExecutor), ('analyze_words', self.analyze_words)):
+            patcher = mock.patch(f'prophetnlg.cache.suffix.{target}', new)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def add_source_rows(self, rows):
+        conn = sqlite3.connect(self.source_path)
+        conn.execute('CREATE TABLE IF NOT EXISTS words (word TEXT, pos TEXT, frequency REAL)')
+        conn.executemany('INSERT INTO words VALUES (?, ?, ?)', rows)
+        conn.commit()
+        conn.close()
+
+    def analyze_words(self, words):
+        self.analyzed.extend(words)
+        return [(word, pos, word != 'xyzzy') for word, pos in words]
+
+    def build(self, **kwargs):
+        build(self.source_path, self.target_path, workers=2, batch_size=2, **kwargs)
+        conn = sqlite3.connect(self.target_path.as_posix())
+        suffixes = conn.execute('SELECT suffix, word, pos FROM suffixes').fetchall()
+        built = conn.execute('SELECT word, pos, known FROM built_words').fetchall()
+        conn.close()
+        return suffixes, built
+
+    def test_build(self):
+        suffixes, built = self.build()
+        # rare words and other parts of speech are left out
+        self.assertEqual(len(self.analyzed), 6)
+        self.assertEqual(sorted(built), sorted([(w, p, int(w != 'xyzzy')) for w, p, f in SOURCE_ROWS if f > 2 and p != 'Adv']))
+        self.assertEqual(len(suffixes), len(set((s, p) for s, w, p in suffixes)))
+        by_suffix = {(s, p): w for s, w, p in suffixes}
+        # the most frequent word of a suffix is kept, compounds by last part
+        self.assertEqual(by_suffix[('kissa', 'N')], 'kissa')
+        self.assertEqual(by_suffix[('si', 'N')], 'aasi')
+        self.assertEqual(by_suffix[('uosta', 'V')], 'juosta')
+        self.assertNotIn(('xyzzy', 'N'), by_suffix)
+
+    def test_incremental_build(self):
+        first_suffixes, first_built = self.build()
+        self.analyzed.clear()
+        self.add_source_rows([('talo', 'N', 10.0)])
+        suffixes, built = self.build()
+        # only the new word is analyzed and nothing is duplicated
+        self.assertEqual(self.analyzed, [('talo', 'N')])
+        self.assertEqual(sorted(built), sorted(first_built + [('talo', 'N', 1)]))
+        self.assertEqual(sorted(suffixes), sorted(first_suffixes + [(s, 'talo', 'N') for s in ('talo', 'alo', 'lo', 'o')]))
+
+        self.analyzed.clear()
+        self.assertEqual(sorted(self.build()[1]), sorted(built))
+        self.assertEqual(self.analyzed, [])
+        # a full build analyzes all words again
+        self.assertEqual(sorted(self.build(full=True)[0]), sorted(suffixes))
+        self.assertEqual(len(self.analyzed), 7)
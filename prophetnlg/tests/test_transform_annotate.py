@@ -1,10 +1,14 @@
+from typing import List
 import unittest
 from prophetnlg import Sentence, SentenceToken
 from prophetnlg.analysis.fin import FinHeuristicSentenceAnalyzer
 from prophetnlg.transform.annotate import (
     IncTokenPassThroughTransform,
-    DecTokenPassThroughTransform
+    DecTokenPassThroughTransform,
+    FusedTokenAnnotationTransform,
+    fuse_transforms
 )
+from prophetnlg.transform.filter import SequentialTokenFilterTransform
 
 
 class TestTokenPassthroughTransform(unittest.TestCase):
@@ -43,3 +47,31 @@ class TestTokenPassthroughTransform(unittest.TestCase):
         sentence_dec2 = dec.transform(sentence_dec1)
         assert all(t.passthrough == 1 for t in sentence_dec1.tokens)
         assert all(t.passthrough == 0 for t in sentence_dec2.tokens)
+
+
+class TestFusedTokenAnnotationTransform(unittest.TestCase):
+    def get_example_sentences(self) -> List[Sentence]:
+        analyzer = FinHeuristicSentenceAnalyzer()
+        sentences = list(analyzer.analyze_text('On ilo testata. Juokse sinä humma kun tuo taivas on niin tumma!'))
+        return sentences + [sentences[0].replace(passthrough=1)]
+
+    def get_transforms(self):
+        inc = IncTokenPassThroughTransform()
+        return [
+            SequentialTokenFilterTransform(effect=0.333),
+            inc,
+            DecTokenPassThroughTransform(),
+            inc,
+            SequentialTokenFilterTransform(effect=0.5001),
+        ]
+
+    def test_fused_equals_chain(self):
+        sentences = self.get_example_sentences()
+        chained = sentences
+        for transform in self.get_transforms():
+            chained = transform.transform_sequence(chained)
+        fused = fuse_transforms(self.get_transforms())
+        self.assertEqual(len(fused), 1)
+        self.assertIsInstance(fused[0], FusedTokenAnnotationTransform)
+        self.assertEqual(fused[0].transform_sequence(sentences), chained)
+        self.assertIs(fused[0].transform(sentences[-1]), sentences[-1])
@@ -1,11 +1,13 @@
 import unittest
 from prophetnlg import Sentence, SentenceToken
+from prophetnlg.batch import SentenceBatch
 from prophetnlg.analysis.fin import FinHeuristicSentenceAnalyzer
 from prophetnlg.transform.filter import (
     SequentialTokenFilterTransform,
     SequentialTokenFilterByPosTransform,
     StochasticTokenFilterTransform,
-    StochasticTokenFilterByPosTransform
+    StochasticTokenFilterByPosTransform,
+    RandomState
 )
 
 
@@ -45,6 +47,21 @@ class TestSequentialTokenFilterTransform(unittest.TestCase):
             [0, 2, 1, 2, 0, 2, 1, 2, 0, 2]
         )
 
+    def test_sequential_filter_batch(self):
+        sentences = [
+            get_sentence('Juokse sinä humma kun tuo taivas on niin tumma!'),
+            get_sentence('Juokse sinä humma kun tuo taivas on niin tumma!').replace(passthrough=1),
+            get_sentence('Tämä on toka.'),
+        ]
+        for get_filter in (
+            lambda: SequentialTokenFilterTransform(effect=0.333),
+            lambda: SequentialTokenFilterByPosTransform(effect_map={'N': 0.5001, 'V': 0.3334}),
+        ):
+            f1, f2 = get_filter(), get_filter()
+            batch = f2.transform_batch(SentenceBatch.from_sentences(sentences))
+            self.assertEqual(batch.to_sentences(), f1.transform_sequence(sentences))
+            self.assertEqual(f1.config.counter, f2.config.counter)
+
 
 class TestStochasticTokenFilterTransform(unittest.TestCase):
     def test_stochastic_filter(self):
@@ -60,3 +77,18 @@ class TestStochasticTokenFilterTransform(unittest.TestCase):
         assert 40 < sum([t.passthrough == 2 for t in sentence_f2.tokens]) < 60
         assert all(t.passthrough in (0, 1) for t in sentence_f1.tokens)
         assert all(t.passthrough in (0, 1, 2) for t in sentence_f2.tokens)
+
+    def test_stochastic_filter_repeatable(self):
+        sentence = get_sentence('juokse sinä juu joo ' * 25)
+        get_filter = lambda: StochasticTokenFilterByPosTransform(
+            effect_map={'V': 0.3, 'Pron': 0.6}, repeatable=True, random=RandomState(seed=7)
+        )
+        f1, f2, f3 = get_filter(), get_filter(), get_filter()
+        tokens = [f1.annotate(t) for t in sentence.tokens]
+        sentence_f2 = f2.transform(sentence)
+        batch_f3 = f3.transform_batch(SentenceBatch.from_sentences([sentence]))
+        self.assertEqual(sentence_f2.tokens, tokens)
+        self.assertEqual(batch_f3.to_sentences(), [sentence_f2])
+        self.assertEqual(f1.config.counter, f3.config.counter)
+        f2.config.reset()
+        self.assertEqual(f2.transform(sentence), sentence_f2)
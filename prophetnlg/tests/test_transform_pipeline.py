@@ -0,0 +1,183 @@
+import itertools
+import threading
+import time
+import unittest
+from prophetnlg import Sentence, SentenceToken
+from prophetnlg.transform.annotate import IncTokenPassThroughTransform, DecTokenPassThroughTransform
+from prophetnlg.transform.base import SentenceToTextTransform, TransformBase
+from prophetnlg.transform.convert import SentencesToTokensTransform, TokenCategoryDemultiplexerTransform
+from prophetnlg.transform.filter import SequentialTokenFilterTransform
+from prophetnlg.transform.pipeline import Channel, Pipeline, PipelineError, RunState
+
+
+def get_sentences(n: int):
+    tokens = [
+        SentenceToken(text='Pöllöt').with_morphologies(['pöllö+N+Pl+Nom'], 'guess'),
+        SentenceToken(text='miettivät', spaces_after='').with_morphologies(['miettiä+V+Act+Ind+Prs+Pl3'], 'guess'),
+        SentenceToken(text='.', spaces_after='').with_morphologies(['.+Punct'], 'guess'),
+    ]
+    return (Sentence(tokens=tokens, formatting=True) for _ in range(n))
+
+
+class TokenTextTransform(TransformBase):
+    inputs = {'token': SentenceToken}
+    outputs = {'text': str}
+
+    def transform_stream(self, tokens):
+        for token in tokens:
+            yield token.text
+
+
+class TestPipeline(unittest.TestCase):
+    def test_chain(self):
+        pipeline = Pipeline()
+        pipeline.add('inc', IncTokenPassThroughTransform())
+        pipeline.add('dec', DecTokenPassThroughTransform())
+        pipeline.add('text', SentenceToTextTransform())
+        self.assertEqual(pipeline.sinks, ['text.text'])
+        texts = list(pipeline.stream(sentence=get_sentences(3)))
+        self.assertEqual(texts, ['Pöllöt miettivät.'] * 3)
+        self.assertEqual([s.items for s in pipeline.stats.values()], [3, 3, 3])
+
+    def test_fan_out_and_in(self):
+        pipeline = Pipeline()
+        pipeline.add('tokens', SentencesToTokensTransform())
+        pipeline.add('demux', TokenCategoryDemultiplexerTransform(categories=['N', 'V']))
+        pipeline.add('both', TokenTextTransform(), ['demux.N', 'demux.V'])
+        sinks = pipeline.run(sentence=get_sentences(2))
+        self.assertEqual(list(sinks), ['both.text'])
+        self.assertEqual(list(sinks['both.text']), ['Pöllöt', 'miettivät'] * 2)
+        self.assertEqual(pipeline.stats['demux'].items, 4)
+
+    def test_fan_out_at_different_rates(self):
+        # one branch gives a text per sentence, the other three tokens
+        pipeline = Pipeline(buffer_size=8, chunk_size=4)
+        pipeline.add('inc', IncTokenPassThroughTransform())
+        pipeline.add('text', SentenceToTextTransform(), 'inc')
+        pipeline.add('dec', DecTokenPassThroughTransform(), 'inc')
+        pipeline.add('tokens', SentencesToTokensTransform(), 'dec')
+        counts = pipeline.drain(sentence=get_sentences(5000))
+        self.assertEqual(counts, {'text.text': 5000, 'tokens.token': 15000})
+
+    def test_bounded_buffers(self):
+        produced = 0
+
+        def source():
+            nonlocal produced
+            for sentence in get_sentences(100000):
+                produced += 1
+                yield sentence
+
+        pipeline = Pipeline(buffer_size=8, chunk_size=4)
+        pipeline.add('inc', IncTokenPassThroughTransform())
+        pipeline.add('text', SentenceToTextTransform())
+        stream = pipeline.stream(sentence=source())
+        self.assertEqual(list(itertools.islice(stream, 10)), ['Pöllöt miettivät.'] * 10)
+        time.sleep(0.2)
+        # a few chunks in each channel and in the hands of each thread
+        self.assertLess(produced, 100)
+        stream.close()
+
+    def test_fan_in_producers(self):
+        # room for one chunk of two items
+        channel = Channel(RunState(), buffer_size=2, chunk_size=2, producers=2)
+
+        def produce(start):
+            for i in range(start, start + 5):
+                channel.put(i)
+            channel.close()
+
+        first = threading.Thread(target=produce, args=(0,), daemon=True)
+        first.start()
+        time.sleep(0.1)
+        # the first producer is blocked on the full queue, the second can
+        # still add to the pending chunk
+        second = threading.Thread(target=channel.put, args=(100,), daemon=True)
+        second.start()
+        second.join(1)
+        self.assertFalse(second.is_alive())
+        self.assertTrue(first.is_alive())
+        second = threading.Thread(target=produce, args=(101,), daemon=True)
+        second.start()
+        self.assertEqual(sorted(channel), [0, 1, 2, 3, 4, 100, 101, 102, 103, 104, 105])
+        first.join(1)
+        second.join(1)
+
+    def test_rare_category(self):
+        rare = SentenceToken(text='.', spaces_after='').with_morphologies(['.+Punct'], 'guess')
+        tokens = get_sentences(1).__next__().tokens[:1] * 50 + [rare]
+        sentences = [Sentence(tokens=tokens) for _ in range(200)]
+        pipeline = Pipeline(buffer_size=16, chunk_size=4)
+        pipeline.add('tokens', SentencesToTokensTransform())
+        pipeline.add('demux', TokenCategoryDemultiplexerTransform(categories=['N', 'Punct']))
+        counts = pipeline.drain(sentence=iter(sentences))
+        self.assertEqual(counts, {'demux.N': 10000, 'demux.Punct': 200})
+
+    def test_stage_error(self):
+        class FailingTransform(IncTokenPassThroughTransform):
+            def passthrough_token(self, token):
+                raise ValueError('broken')
+
+        pipeline = Pipeline()
+        pipeline.add('fail', FailingTransform())
+        with self.assertRaises(ValueError):
+            list(pipeline.stream(sentence=get_sentences(10)))
+
+    def test_parallel_stages(self):
+        pipeline = Pipeline()
+        pipeline.add('filter', SequentialTokenFilterTransform(effect=0.5001), workers=4)
+        pipeline.add('inc', IncTokenPassThroughTransform(), workers=2)
+        self.assertEqual([s.workers for s in pipeline.stages.values()], [1, 2])
+        parallel = list(pipeline.stream(sentence=get_sentences(100)))
+        serial = IncTokenPassThroughTransform().transform_sequence(
+            SequentialTokenFilterTransform(effect=0.5001).transform_sequence(get_sentences(100))
+        )
+        self.assertEqual(parallel, serial)
+        inc = IncTokenPassThroughTransform()
+        threaded = list(inc.transform_stream(get_sentences(100), workers=2, chunk_size=7, processes=False))
+        self.assertEqual(threaded, inc.transform_sequence(get_sentences(100)))
+
+    def test_stateless_not_inherited(self):
+        class CountingTransform(IncTokenPassThroughTransform):
+            def __init__(self):
+                super().__init__()
+                self.count = 0
+
+            def passthrough_token(self, token):
+                self.count += 1
+                return self.count % 2
+
+        class PureTransform(CountingTransform):
+            stateless = True
+
+        self.assertTrue(IncTokenPassThroughTransform().is_stateless())
+        self.assertFalse(CountingTransform().is_stateless())
+        self.assertTrue(PureTransform().is_stateless())
+        pipeline = Pipeline()
+        pipeline.add('count', CountingTransform(), workers=4)
+        self.assertEqual(pipeline.stages['count'].workers, 1)
+        self.assertEqual(
+            list(pipeline.stream(sentence=get_sentences(10))),
+            CountingTransform().transform_sequence(get_sentences(10))
+        )
+
+    def test_validation(self):
+        pipeline = Pipeline()
+        pipeline.add('text', SentenceToTextTransform())
+        with self.assertRaises(PipelineError):
+            pipeline.add('inc', IncTokenPassThroughTransform(), 'text')
+        with self.assertRaises(PipelineError):
+            pipeline.add('inc', IncTokenPassThroughTransform(), 'missing')
+        with self.assertRaises(PipelineError):
+            pipeline.add('demux', TokenCategoryDemultiplexerTransform(categories=['N']), 'sentence')
+        with self.assertRaises(PipelineError):
+            pipeline.add('inc', IncTokenPassThroughTransform(), {'token': 'sentence'})
+        with self.assertRaises(PipelineError):
+            pipeline.add('text', SentenceToTextTransform(), 'sentence')
+
+    def test_demultiplexer_stream(self):
+        demux = TokenCategoryDemultiplexerTransform(categories=['N', 'V'])
+        tokens = [t for s in get_sentences(3) for t in s.tokens]
+        streams = demux.transform_stream(tokens)
+        self.assertEqual([t.text for t in streams['V']], ['miettivät'] * 3)
+        self.assertEqual([t.text for t in streams['N']], ['Pöllöt'] * 3)
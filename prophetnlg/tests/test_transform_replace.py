@@ -98,6 +98,27 @@ class TestMapTransform(TestMixin, unittest.TestCase):
         new_sentence = transform.transform(source_sentence)
         self.assertEqual(new_sentence.as_text(), 'Pöllö hyppäsi ajatukseen - ajatuksen aamua ui syvä pöllö.')
 
+    def test_frozen_map_stream_transform(self):
+        replacements = self._get_tokens_dict('Pöllöt miettivät syviä ajatuksia aamulla.')
+        replacements = {pos: stream for pos, stream in replacements.items() if pos in ('N', 'A')}
+        transform = LemmaMapStreamTransform(
+            generator=self.generator,
+            replacements=replacements
+        )
+        source_sentence = next(self.analyzer.analyze_text('Jarno hyppäsi veteen.'))
+        new_sentence = transform.transform(source_sentence)
+        frozen = LemmaMapStreamTransform(
+            generator=self.generator,
+            replacements={},
+            lemma_mappings=transform.config.lemma_mappings,
+            frozen=True
+        )
+        self.assertFalse(transform.is_stateless())
+        self.assertTrue(frozen.is_stateless())
+        self.assertEqual(frozen.transform(source_sentence).as_text(), new_sentence.as_text())
+        other_sentence = next(self.analyzer.analyze_text('Pelle hyppäsi veteen.'))
+        self.assertEqual(frozen.transform(other_sentence).as_text(), 'Pelle hyppäsi ajatukseen.')
+
     def test_transform_bible_to_jokes(self):
         bible = os.path.join(DATA_DIR, 'vt_1moos_1_2.txt')
         jokes = os.path.join(DATA_DIR, 'vitsit.txt')
@@ -0,0 +1,61 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from prophetnlg.cache.trie import SuffixTrie, build_trie_file
+
+WORDS = [
+    ('kissa', 'N'), ('koira', 'N'), ('massa', 'N'), ('talo', 'N'),
+    ('juosta', 'V'), ('kimmeltää', 'V'), ('huheltaa', 'V'), ('kaunis', 'A'),
+]
+
+
+def create_cache_db(path: str):
+    # same layout as prophetnlg.cache.suffix builds
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE suffixes (suffix TEXT, word TEXT, pos TEXT)')
+    seen = set()
+    for word, pos in WORDS:
+        for i in range(len(word)):
+            if (word[i:], pos) not in seen:
+                seen.add((word[i:], pos))
+                conn.execute('INSERT INTO suffixes VALUES (?, ?, ?)', (word[i:], word, pos))
+    conn.commit()
+    return conn
+
+
+def find_sql(conn, word: str, pos: str):
+    words = [word[idx:] for idx in range(len(word))]
+    placeholders = ','.join('?' for char in word)
+    sql = f'SELECT word, suffix FROM suffixes WHERE pos = ? AND suffix in ({placeholders}) ORDER BY length(suffix) DESC LIMIT 1'
+    result = conn.execute(sql, [pos] + words).fetchone()
+    return tuple(result) if result else None
+
+
+class TestSuffixTrie(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, 'cache.db')
+        self.trie_path = os.path.join(self.tmp.name, 'suffixes.trie')
+        self.conn = create_cache_db(self.db_path)
+        build_trie_file(self.db_path, self.trie_path)
+        self.trie = SuffixTrie.load(self.trie_path)
+
+    def tearDown(self):
+        self.conn.close()
+        self.tmp.cleanup()
+
+    def test_find(self):
+        self.assertEqual(self.trie.find('Merhab', 'N'), None)
+        # first word of a suffix wins
+        self.assertEqual(self.trie.find('Truuda', 'N'), ('kissa', 'a'))
+        self.assertEqual(self.trie.find('Xassa', 'N'), ('massa', 'assa'))
+        self.assertEqual(self.trie.find('puhaltaa', 'V'), ('huheltaa', 'ltaa'))
+        self.assertEqual(self.trie.find('talo', 'N'), ('talo', 'talo'))
+        self.assertEqual(self.trie.find('talo', 'Adv'), None)
+
+    def test_same_as_sql(self):
+        queries = ['Truuda', 'kissa', 'omassa', 'sa', 'heltää', 'ltaa', 'sta', 'is', 'rauhallinen', 'koirassa']
+        for word in queries:
+            for pos in ('N', 'V', 'A'):
+                self.assertEqual(self.trie.find(word, pos), find_sql(self.conn, word, pos), (word, pos))
@@ -0,0 +1,73 @@
+import asyncio
+import tempfile
+import unittest
+from prophetnlg.analysis.ud import UDSentenceAnalyzer
+from prophetnlg.analysis.udclient import UDParseClient, UDParseError, split_conllu
+from .udstub import StubParserServer, stub_conllu
+
+
+class TestUDParseClient(unittest.TestCase):
+    def test_keep_alive(self):
+        with StubParserServer() as server:
+            client = UDParseClient(server.url, concurrency=1)
+
+            async def run():
+                return [await client.parse(f'Sana{i}.') for i in range(5)]
+
+            results = asyncio.run(run())
+            self.assertEqual(results, [stub_conllu(f'Sana{i}.') for i in range(5)])
+            self.assertEqual(server.connections, 1)
+
+    def test_concurrency(self):
+        with StubParserServer(delay=0.2) as server:
+            client = UDParseClient(server.url, concurrency=4, batch_size=1)
+            results = asyncio.run(client.parse_many([f'Teksti {i}.' for i in range(12)]))
+            self.assertEqual(server.max_active, 4)
+            self.assertEqual(results[3], stub_conllu('Teksti 3.'))
+
+    def test_batching(self):
+        texts = ['Eka lause. Toka lause.', '', 'Kolmas.', 'Neljäs.']
+        with StubParserServer() as server:
+            client = UDParseClient(server.url, batch_size=3)
+            results = asyncio.run(client.parse_many(texts))
+            self.assertEqual(len(server.requests), 1)
+        self.assertEqual(results, [stub_conllu(t) for t in texts])
+
+    def test_retry(self):
+        with StubParserServer() as server:
+            server.failures = 2
+            client = UDParseClient(server.url, retries=2)
+            self.assertEqual(asyncio.run(client.parse('Moi.')), stub_conllu('Moi.'))
+            server.failures = 3
+            with self.assertRaises(UDParseError):
+                asyncio.run(client.parse('Moi.'))
+
+    def test_timeout(self):
+        with StubParserServer(delay=0.5) as server:
+            client = UDParseClient(server.url, timeout=0.1, retries=1)
+            with self.assertRaises(asyncio.TimeoutError):
+                asyncio.run(client.parse('Hidas.'))
+            self.assertEqual(len(server.requests), 2)
+
+    def test_split_conllu(self):
+        self.assertEqual(split_conllu(stub_conllu('Yksi.\n\n¶\n\nKaksi.')), [stub_conllu('Yksi.'), stub_conllu('Kaksi.')])
+
+
+class TestUDAnalyzerAsync(unittest.TestCase):
+    def test_analyze_texts_async(self):
+        with StubParserServer() as server:
+            analyzer = UDSentenceAnalyzer(lang='fin', parser_url=server.url, parser_batch_size=2)
+            results = asyncio.run(analyzer.analyze_texts_async(['Kissa juoksi.', 'Koira. Hauva.']))
+        self.assertEqual([[s.as_text() for s in r] for r in results], [['Kissa juoksi.'], ['Koira.', 'Hauva.']])
+        self.assertEqual(results[1][0].tokens[0].analyses['ud'].get_morphologies(), {'koira.+N+Sg+Nom'})
+
+    def test_parse_cache(self):
+        with StubParserServer() as server, tempfile.TemporaryDirectory() as tmp:
+            analyzer = UDSentenceAnalyzer(lang='fin', parser_url=server.url, cache_dir=tmp)
+            first = [s.as_text() for s in analyzer.analyze_text('Kissa juoksi. Koira.')]
+            asyncio.run(analyzer.analyze_texts_async(['Kissa juoksi. Koira.', 'Hauva.']))
+            second = [s.as_text() for s in analyzer.analyze_text('Hauva.')]
+            self.assertEqual(server.requests, ['Kissa juoksi. Koira.', 'Hauva.'])
+        self.assertEqual(first, ['Kissa juoksi.', 'Koira.'])
+        self.assertEqual(second, ['Hauva.'])
+        self.assertEqual(analyzer.tokenizer.cache.stats.hits, 2)
@@ -0,0 +1,83 @@
+import logging
+import os
+import time
+import unittest
+import pytest
+from uralicNLP.ud_tools import UD_node
+from prophetnlg.analysis.conllu import _file_lines, read_conllu_rows
+from prophetnlg.analysis.udparse import _morphology_parts, get_morphology_parts, morphology_parts
+from . import udparse_baseline as baseline
+
+logger = logging.getLogger(__name__)
+
+UD_CONLLU_ENV = 'PROPHETNLG_UD_CONLLU'
+
+# (lemma, UPOS, FEATS, MISC) and the tags given by the original if/elif
+# implementation
+EXPECTED_PARTS = [
+    (('kissa', 'NOUN', 'Case=Nom|Number=Sing', '_'), ['N', 'Sg', 'Nom']),
+    (('Helsinki', 'PROPN', 'Case=Ine|Number=Sing', 'SpaceAfter=No'), ['N', 'Prop', 'Sg', 'Ine']),
+    (('nopeasti', 'ADV', 'Derivation=Sti', '_'), ['Adv', 'Pos', 'Man']),
+    (('ei', 'AUX', 'Clitic=Ka|Number=Sing|Person=3|Polarity=Neg|VerbForm=Fin|Voice=Act', '_'), ['CC', 'Foc_kA', 'Sg3', 'Neg']),
+    (('juosta', 'VERB', 'Connegative=Yes|Mood=Ind|Tense=Pres|VerbForm=Fin', '_'), ['V', 'Act', 'Prs', 'ConNeg']),
+    (('juosta', 'VERB', 'Mood=Cnd|Number=Plur|Person=1|VerbForm=Fin|Voice=Act', '_'), ['V', 'Act', 'Cond', 'Pl1']),
+    (('juosta', 'VERB', 'InfForm=1|Number=Sing|VerbForm=Inf|Voice=Act', '_'), ['V', 'Inf1', 'Lat']),
+    (('talo', 'NOUN', 'Case=Ela|Number=Plur|Number[psor]=Sing|Person[psor]=1', '_'), ['N', 'Pl', 'Ela', 'PxSg1']),
+    (('talo', 'NOUN', 'Case=Gen|Number=Sing|Person[psor]=3', '_'), ['N', 'PxSp3', 'Sg', 'Gen']),
+    (('minä', 'PRON', 'Case=Nom|Number=Sing|Person=1|PronType=Prs', '_'), ['Pron', 'Pers', 'Sg', 'Nom']),
+    (('—', 'PUNCT', '_', 'PunctType=Dash'), ['Punct', 'EmDash']),
+    (('–', 'PUNCT', 'Case=Nom|Number=Sing', 'PunctType=Dash|SpaceAfter=No'), ['Punct', 'EnDash']),
+    (('"', 'PUNCT', '_', 'PunctType=Quotation'), ['Punct', 'Quote']),
+    (('3', 'NUM', 'NumType=Card', 'NumType=Card'), ['Num', 'Card']),
+    (('kolmas', 'ADJ', 'Case=Nom|Degree=Pos|Number=Sing|NumType=Ord', '_'), ['A', 'Pos', 'Ord', 'Sg', 'Nom']),
+    (('EU', 'PROPN', 'Abbr=Yes|Case=Nom|Number=Sing', '_'), ['Abbr', 'Sg', 'Nom']),
+    (('syöty', 'VERB', 'Case=Nom|Derivation=TU|PartForm=Past', 'Derivation=Tava'), ['V', 'Pass', 'Pss', 'Nom']),
+    (('olla', 'AUX', 'Mood=Pot|Number=Sing|Person=4|Voice=Pass', 'Mood=Opt|Person=4'), ['V', 'Pass', 'Opt', 'Pot', 'Sg', 'Pe4', 'Pe4']),
+    (('ali', 'ADP', 'AdpType=Post', '_'), ['Adp', 'Po']),
+    (('itse', 'PRON', 'Reflex=Yes|Clitic=Kin', 'PropnType=Yes'), ['Pron', 'Prop', 'Refl', 'Foc_Kin']),
+]
+
+
+class TestMorphologyParts(unittest.TestCase):
+    def test_expected_parts(self):
+        for (lemma, pos, feats, misc), expected in EXPECTED_PARTS:
+            node = UD_node('1', lemma, lemma, pos, '_', feats, misc)
+            # twice, the second one is memoized
+            self.assertEqual(get_morphology_parts(node), expected)
+            self.assertEqual(morphology_parts(lemma, pos, feats, misc), expected)
+            self.assertEqual(baseline.morphology_parts(lemma, pos, feats, misc), expected)
+
+    def test_lemma_classes(self):
+        # lemmas sharing a memoized bundle still get their own tags
+        self.assertEqual(morphology_parts('nopeasti', 'ADV', '_', '_'), ['Adv', 'Pos', 'Man'])
+        self.assertEqual(morphology_parts('kovin', 'ADV', '_', '_'), ['Adv'])
+        self.assertEqual(morphology_parts('-', 'PUNCT', '_', 'PunctType=Dash'), ['Punct', 'Dash'])
+        self.assertEqual(morphology_parts('—', 'PUNCT', '_', 'PunctType=Dash'), ['Punct', 'EmDash'])
+
+
+@pytest.mark.slow
+@unittest.skipUnless(os.environ.get(UD_CONLLU_ENV), f'set {UD_CONLLU_ENV} to a UD CoNLL-U file')
+class TestMorphologyPartsBenchmark(unittest.TestCase):
+    # e.g. fi_tdt-ud-train.conllu of UD_Finnish-TDT
+    def test_ud_file(self):
+        path = os.environ[UD_CONLLU_ENV]
+        rows = [
+            (c[2], c[3], c[5], c[9])
+            for sentence in read_conllu_rows(_file_lines(path, use_mmap=True))
+            for c in sentence
+        ]
+
+        start = time.perf_counter()
+        expected = [baseline.morphology_parts(*row) for row in rows]
+        baseline_time = time.perf_counter() - start
+
+        _morphology_parts.cache_clear()
+        start = time.perf_counter()
+        parts = [morphology_parts(*row) for row in rows]
+        table_time = time.perf_counter() - start
+
+        self.assertEqual(parts, expected)
+        logger.info(
+            '%d words, if/elif %.3fs, table driven and memoized %.3fs',
+            len(rows), baseline_time, table_time
+        )
@@ -0,0 +1,93 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import time
+from typing import List
+
+
+def stub_conllu(text: str) -> str:
+    # one sentence per '.' terminated run of words in each paragraph,
+    # every word a singular nominative noun
+    sentences: List[List[str]] = []
+    for paragraph in text.split('\n\n'):
+        words: List[str] = []
+        for word in paragraph.split():
+            words.append(word)
+            if word.endswith('.') or word == '¶':
+                sentences.append(words)
+                words = []
+        if words:
+            sentences.append(words)
+    blocks = []
+    for words in sentences:
+        # the first word is the root, others depend on it
+        lines = [
+            f'{i}\t{w}\t{w.lower()}\tNOUN\t_\tCase=Nom|Number=Sing\t{min(i - 1, 1)}\t_\t_\t_'
+            for i, w in enumerate(words, 1)
+        ]
+        blocks.append('\n'.join(lines) + '\n')
+    return '\n'.join(blocks)
+
+
+class StubParserHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_POST(self):
+        server = self.server
+        text = self.rfile.read(int(self.headers['Content-Length'])).decode('utf-8')
+        server.requests.append(text)
+        if server.failures:
+            server.failures -= 1
+            status, body = 503, b'busy'
+        else:
+            with server.lock:
+                server.active += 1
+                server.max_active = max(server.max_active, server.active)
+            time.sleep(server.delay)
+            with server.lock:
+                server.active -= 1
+            status, body = 200, stub_conllu(text).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubParserServer(ThreadingHTTPServer):
+    # stands in for the Turku neural parser server of services.sh
+    daemon_threads = True
+
+    def __init__(self, delay: float = 0.0):
+        super().__init__(('127.0.0.1', 0), StubParserHandler)
+        self.delay = delay
+        self.failures = 0
+        self.connections = 0
+        self.requests: List[str] = []
+        # requests being answered at once
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    def handle_error(self, request, client_address):
+        # clients that time out close the connection before the response
+        pass
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
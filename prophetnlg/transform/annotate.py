@@ -1,5 +1,5 @@
 import abc
-from typing import Callable, Mapping, MutableMapping, Sequence, Union
+from typing import Callable, List, Mapping, MutableMapping, Sequence, Union
 from prophetnlg import Sentence, SentenceToken
 from .base import SentenceTransformBase
 
@@ -9,25 +9,100 @@ class TokenAnnotationTransformBase(SentenceTransformBase):
     def annotate(self, token: SentenceToken) -> SentenceToken:
         pass
 
+    # transforms deciding all tokens of a sentence at once override this
+    def annotate_tokens(self, tokens: Sequence[SentenceToken]) -> List[SentenceToken]:
+        return [self.annotate(t) for t in tokens]
+
     def get_sentence(self, sentence: Sentence) -> Sentence:
-        return sentence.replace(tokens=[self.annotate(t) for t in sentence.tokens])
+        return sentence.replace(tokens=self.annotate_tokens(sentence.tokens))
 
 
 class IncTokenPassThroughTransform(TokenAnnotationTransformBase):
+    stateless = True
+
     def passthrough_token(self, token: SentenceToken) -> int:
         return 1
 
+    def passthrough_tokens(self, tokens: Sequence[SentenceToken]) -> List[int]:
+        return [self.passthrough_token(t) for t in tokens]
+
     def annotate(self, token: SentenceToken) -> SentenceToken:
         return token.replace(passthrough=token.passthrough + self.passthrough_token(token))
 
+    def annotate_tokens(self, tokens: Sequence[SentenceToken]) -> List[SentenceToken]:
+        return [
+            t.replace(passthrough=t.passthrough + p)
+            for t, p in zip(tokens, self.passthrough_tokens(tokens))
+        ]
+
 
 class DecTokenPassThroughTransform(TokenAnnotationTransformBase):
+    stateless = True
+
     def annotate(self, token: SentenceToken) -> SentenceToken:
         return token.replace(passthrough=max(token.passthrough - 1, 0))
 
 
+class FusedTokenAnnotationTransform(SentenceTransformBase):
+    # Runs the annotate_tokens of each transform over the tokens and builds
+    # one sentence. Token annotation transforms never change the sentence
+    # passthrough, so skipping passthrough sentences once is the same as each
+    # transform skipping them, and the stages run one after another like in
+    # a chain, which keeps counters, shared instances and the global numpy
+    # random state identical.
+    def __init__(self, transforms: Sequence[TokenAnnotationTransformBase]):
+        super().__init__()
+        assert all(is_fusable(t) for t in transforms)
+        self.transforms = list(transforms)
+
+    def get_sentence(self, sentence: Sentence) -> Sentence:
+        tokens = sentence.tokens
+        for transform in self.transforms:
+            tokens = transform.annotate_tokens(tokens)
+        return sentence.replace(tokens=tokens)
+
+    def is_stateless(self) -> bool:
+        return all(t.is_stateless() for t in self.transforms)
+
+    def reset(self):
+        super().reset()
+        for transform in self.transforms:
+            transform.reset()
+
+
+def is_fusable(transform: SentenceTransformBase) -> bool:
+    # subclasses changing how the sentence is built are kept as they are
+    cls = type(transform)
+    return (
+        isinstance(transform, TokenAnnotationTransformBase)
+        and cls.get_sentence is TokenAnnotationTransformBase.get_sentence
+        and cls.transform is SentenceTransformBase.transform
+    )
+
+
+def fuse_transforms(transforms: Sequence[SentenceTransformBase]) -> List[SentenceTransformBase]:
+    # replaces each run of consecutive fusable transforms with one
+    # FusedTokenAnnotationTransform
+    result: List[SentenceTransformBase] = []
+    run: List[TokenAnnotationTransformBase] = []
+    for transform in list(transforms) + [None]:
+        if transform is not None and is_fusable(transform):
+            run.append(transform)
+            continue
+        if len(run) > 1:
+            result.append(FusedTokenAnnotationTransform(run))
+        else:
+            result.extend(run)
+        run = []
+        if transform is not None:
+            result.append(transform)
+    return result
+
+
 
 class IncSentencePassThroughTransform(SentenceTransformBase):
+    stateless = True
+
     def passthrough_sentence(self, token: Sentence) -> int:
         return 1
 
@@ -36,5 +111,7 @@ class IncSentencePassThroughTransform(SentenceTransformBase):
 
 
 class DecSentencePassThroughTransform(SentenceTransformBase):
+    stateless = True
+
     def get_sentence(self, sentence: Sentence) -> Sentence:
         return sentence.replace(passthrough=max(sentence.passthrough - 1, 0))
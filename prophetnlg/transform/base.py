@@ -1,15 +1,46 @@
-from typing import Any, ClassVar, Iterable, List, Mapping, Optional, Sequence, Type
+import abc
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, ClassVar, Deque, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Type
+from more_itertools import chunked
 from pydantic import BaseModel
 from prophetnlg import Sentence, SentenceToken
+from prophetnlg.batch import SentenceBatch
 from prophetnlg.module import ConfigBase
+from prophetnlg.parallel import imap_ordered
+
+DEFAULT_CHUNK_SIZE = 64
+
+# transform of a pool worker process, set once by _init_worker
+_worker_transform: Optional['TransformBase'] = None
+
+
+def _init_worker(transform: 'TransformBase'):
+    global _worker_transform
+    _worker_transform = transform
+
+
+def _transform_chunk(sentences: List[Sentence]) -> list:
+    return [_worker_transform.transform(s) for s in sentences]
 
 
 class TransformBase:
     inputs: ClassVar[Mapping[str, Any]]
     outputs: ClassVar[Mapping[str, Any]]
+    # stateless transforms give the same result for a sentence whatever was
+    # transformed before it, so their streams can be split between workers.
+    # Each class declares it itself, see __init_subclass__.
+    stateless: ClassVar[bool] = False
     config_class: ClassVar[Type[ConfigBase]] = ConfigBase
     config: ConfigBase
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # a subclass may keep state across sentences, so it is not stateless
+        # unless it says so
+        if 'stateless' not in cls.__dict__:
+            cls.stateless = False
+
     def __init__(self, config: Optional[ConfigBase] = None, **kwargs):
         if config:
             assert isinstance(config, self.config_class)
@@ -19,6 +50,52 @@ class TransformBase:
             self.config = self.config_class(**kwargs)
         self.original_config = self.config.copy()
 
+    # ports of the transform_stream arguments and results, transforms with
+    # config dependent ports override these
+    def get_inputs(self) -> Mapping[str, Any]:
+        return self.inputs
+
+    def get_outputs(self) -> Mapping[str, Any]:
+        return self.outputs
+
+    def is_stateless(self) -> bool:
+        return self.stateless
+
+    # result of a single input item, used by the default transform_stream
+    def transform(self, sentence: Sentence) -> Any:
+        raise NotImplementedError
+
+    def transform_sequence(self, sentences: Iterable[Sentence]) -> List[Any]:
+        return [self.transform(s) for s in sentences]
+
+    def transform_stream(
+        self,
+        sentences: Iterable[Sentence],
+        workers: int = 1,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        processes: bool = True
+    ) -> Iterable[Any]:
+        # stateful transforms are always run serially
+        if workers > 1 and self.is_stateless():
+            yield from self._transform_parallel(sentences, workers, chunk_size, processes)
+            return
+        for sentence in sentences:
+            yield self.transform(sentence)
+
+    def _transform_parallel(self, sentences: Iterable[Sentence], workers: int, chunk_size: int, processes: bool) -> Iterator:
+        # chunks are transformed in a pool with at most 2 * workers chunks in
+        # flight, results come in input order
+        executor: Executor
+        if processes:
+            executor = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(self,))
+            func = _transform_chunk
+        else:
+            executor = ThreadPoolExecutor(workers)
+            func = lambda chunk: [self.transform(s) for s in chunk]
+        with executor:
+            for results in imap_ordered(executor, func, chunked(sentences, chunk_size), max_pending=2 * workers):
+                yield from results
+
     def reset(self):
         self.config = self.original_config
 
@@ -35,17 +112,20 @@ class SentenceTransformBase(TransformBase):
             return sentence
         return self.get_sentence(sentence)
 
-    def transform_sequence(self, sentences: Iterable[Sentence]) -> List[Sentence]:
-        return [self.transform(s) for s in sentences]
+    # vectorized transforms override this to work on the batch columns
+    def transform_batch(self, batch: SentenceBatch) -> SentenceBatch:
+        sentences = self.transform_sequence(batch.iter_sentences())
+        return SentenceBatch.from_sentences(sentences, vocabulary=batch.vocabulary)
 
-    def transform_stream(self, sentences: Iterable[Sentence]) -> Iterable[Sentence]:
-        for sentence in sentences:
-            yield self.transform(sentence)
+    def transform_batches(self, batches: Iterable[SentenceBatch]) -> Iterable[SentenceBatch]:
+        for batch in batches:
+            yield self.transform_batch(batch)
 
 
 class SentenceToTextTransform(TransformBase):
     inputs = {'sentence': Sentence}
     outputs = {'text': str}
+    stateless = True
 
     def get_text(self, sentence: Sentence) -> str:
         return sentence.as_text()
@@ -55,9 +135,29 @@ class SentenceToTextTransform(TransformBase):
             return sentence.as_text()
         return self.get_text(sentence)
 
-    def transform_sequence(self, sentences: Iterable[Sentence]) -> List[str]:
-        return [self.transform(s) for s in sentences]
 
-    def transform_stream(self, sentences: Iterable[Sentence]) -> Iterable[str]:
-        for sentence in sentences:
-            yield self.transform(sentence)
+class RoutingTransformBase(TransformBase):
+    # Sends each input item to one output port, or drops it when route gives
+    # None. A pipeline buffers the ports itself, transform_stream is for use
+    # outside one and keeps each item only in the buffer of its port.
+    @abc.abstractmethod
+    def route(self, item: Any) -> Optional[str]:
+        pass
+
+    def transform_stream(self, items: Iterable[Any]) -> Dict[str, Iterator[Any]]:
+        iterator = iter(items)
+        buffers: Dict[str, Deque[Any]] = {port: deque() for port in self.get_outputs()}
+
+        def port_stream(own: Deque[Any]) -> Iterator[Any]:
+            while True:
+                while not own:
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        return
+                    port = self.route(item)
+                    if port is not None:
+                        buffers[port].append(item)
+                yield own.popleft()
+
+        return {port: port_stream(buffer) for port, buffer in buffers.items()}
@@ -1,8 +1,6 @@
-from operator import attrgetter
-import itertools
-from typing import Dict, Iterable, Iterator, List
+from typing import Any, Iterable, Iterator, List, Mapping, Optional
 from prophetnlg import Sentence, SentenceToken
-from .base import ConfigBase, TransformBase
+from .base import ConfigBase, RoutingTransformBase, TransformBase
 
 
 class TokenCategoryDemultiplexerConfig(ConfigBase):
@@ -11,6 +9,9 @@ class TokenCategoryDemultiplexerConfig(ConfigBase):
 
 
 class SentencesToTokensTransform(TransformBase):
+    inputs = {'sentence': Sentence}
+    outputs = {'token': SentenceToken}
+
     def transform(self, sentence: Sentence) -> List[SentenceToken]:
         if sentence.passthrough:
             return []
@@ -24,15 +25,14 @@ class SentencesToTokensTransform(TransformBase):
             yield from self.transform(sentence)
 
 
-class TokenCategoryDemultiplexerTransform(TransformBase):
+class TokenCategoryDemultiplexerTransform(RoutingTransformBase):
     config_class = TokenCategoryDemultiplexerConfig
     config: TokenCategoryDemultiplexerConfig
+    inputs = {'token': SentenceToken}
 
-    def transform_stream(self, tokens: Iterable[SentenceToken]) -> Dict[str, Iterator[SentenceToken]]:
-        streams = itertools.tee(tokens, len(self.config.categories))
-        get_category = attrgetter(self.config.category_attr)
+    def get_outputs(self) -> Mapping[str, Any]:
+        return {category: SentenceToken for category in self.config.categories}
 
-        return {
-            category: filter((lambda token, c=category: get_category(token) == c), stream)
-            for category, stream in zip(self.config.categories, streams)
-        }
+    def route(self, token: SentenceToken) -> Optional[str]:
+        category = getattr(token, self.config.category_attr)
+        return category if category in self.config.categories else None
@@ -1,8 +1,9 @@
 from enum import Enum
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Sequence
 import numpy as np
-from pydantic import BaseModel, Extra
+from pydantic import BaseModel, Extra, Field, PrivateAttr
 from prophetnlg import Sentence, SentenceToken
+from prophetnlg.batch import SentenceBatch
 from .annotate import IncTokenPassThroughTransform
 from .base import ConfigBase
 
@@ -10,6 +11,17 @@ from .base import ConfigBase
 class RandomState(BaseModel):
     seed: Optional[int] = None
     state: tuple = ()
+    _random: np.random.RandomState = PrivateAttr()
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._random = np.random.RandomState(self.seed)
+        if self.state:
+            self._random.set_state(self.state)
+
+    def rand(self, *size: int):
+        # rand(n) gives the same numbers as n calls of rand()
+        return self._random.rand(*size)
 
 
 class EffectConfig(ConfigBase):
@@ -18,6 +30,12 @@ class EffectConfig(ConfigBase):
     def get_effect(self, token: SentenceToken) -> float:
         return self.effect
 
+    def get_token_effects(self, tokens: Sequence[SentenceToken]) -> np.ndarray:
+        return np.full(len(tokens), self.effect)
+
+    def get_effects(self, batch: SentenceBatch) -> np.ndarray:
+        return np.full(batch.n_tokens, self.effect)
+
 
 class EffectMapConfig(ConfigBase):
     effect_map: Dict[str, float] = {}
@@ -30,6 +48,18 @@ class EffectMapConfig(ConfigBase):
         category = self.get_token_category(token)
         return self.effect_map.get(category, 0.0)
 
+    def get_token_effects(self, tokens: Sequence[SentenceToken]) -> np.ndarray:
+        effect_map, attr = self.effect_map, self.category_attr
+        return np.array([effect_map.get(getattr(t, attr), 0.0) for t in tokens], dtype=np.float64)
+
+    def get_effects(self, batch: SentenceBatch) -> np.ndarray:
+        # interned columns (pos, lemma, morphology) go through a lookup table
+        ids = getattr(batch, f'{self.category_attr}_ids', None)
+        if ids is None:
+            tokens = (t for s in batch.iter_sentences() for t in s.tokens)
+            return np.array([self.get_effect(t) for t in tokens], dtype=np.float64)
+        return batch.vocabulary.lookup_table(self.effect_map)[ids]
+
 
 class SequentialConfig(ConfigBase):
     counter: int = 1
@@ -41,11 +71,16 @@ class SequentialConfig(ConfigBase):
 class StochasticConfig(SequentialConfig):
     counter: int = 1
     repeatable: bool = False
-    random: RandomState = RandomState()
+    random: RandomState = Field(default_factory=RandomState)
 
     def reset(self):
         self.counter = 1
-        self.random = RandomState(self.random_state.seed)
+        self.random = RandomState(seed=self.random.seed)
+
+    def rand(self, n: int) -> np.ndarray:
+        # n draws in one call, from the same stream as the per token draws
+        random = self.random if self.repeatable else np.random
+        return random.rand(n)
 
 
 class SequentialTokenFilterConfig(SequentialConfig, EffectConfig):
@@ -67,6 +102,8 @@ class StochasticTokenPosFilterConfig(StochasticConfig, EffectMapConfig):
 class SequentialTokenFilterTransformBase(IncTokenPassThroughTransform):
     config_class = SequentialTokenFilterConfig
     config: SequentialTokenFilterConfig
+    # counters and random state depend on the earlier tokens
+    stateless = False
 
     def passthrough_token(self, token: SentenceToken) -> int:
         if token.passthrough:
@@ -78,10 +115,35 @@ class SequentialTokenFilterTransformBase(IncTokenPassThroughTransform):
         self.config.counter += 1
         return int(int(prev_iter) == int(this_iter))
 
+    def _passthrough_active(self, effects: np.ndarray) -> np.ndarray:
+        # the scalar check for counters counter, counter + 1, ... at once,
+        # trunc is int() and the products are the same float operations
+        counters = self.config.counter + np.arange(len(effects), dtype=np.int64)
+        self.config.counter += len(effects)
+        return np.trunc(counters * effects) == np.trunc((counters + 1) * effects)
+
+    def passthrough_tokens(self, tokens: Sequence[SentenceToken]) -> List[int]:
+        active = [i for i, t in enumerate(tokens) if not t.passthrough]
+        result = [1] * len(tokens)
+        if active:
+            effects = self.config.get_token_effects([tokens[i] for i in active])
+            for i, p in zip(active, self._passthrough_active(effects).tolist()):
+                result[i] = int(p)
+        return result
+
+    def transform_batch(self, batch: SentenceBatch) -> SentenceBatch:
+        sentence_active = batch.token_sentence_passthrough == 0
+        active = sentence_active & (batch.passthrough == 0)
+        increment = sentence_active.astype(np.int32)
+        if active.any():
+            increment[active] = self._passthrough_active(self.config.get_effects(batch)[active])
+        return batch.replace(passthrough=batch.passthrough + increment)
+
 
 class StochasticTokenFilterTransformBase(IncTokenPassThroughTransform):
     config_class = StochasticTokenFilterConfig
     config: StochasticTokenFilterConfig
+    stateless = False
 
     def passthrough_token(self, token: SentenceToken) -> int:
         if token.passthrough:
@@ -90,6 +152,30 @@ class StochasticTokenFilterTransformBase(IncTokenPassThroughTransform):
         random = self.config.random if self.config.repeatable else np.random
         return int(self.config.get_effect(token) < random.rand())
 
+    def passthrough_tokens(self, tokens: Sequence[SentenceToken]) -> List[int]:
+        active = [i for i, t in enumerate(tokens) if not t.passthrough]
+        result = [1] * len(tokens)
+        if active:
+            effects = self.config.get_token_effects([tokens[i] for i in active])
+            keep = effects < self.config.rand(len(active))
+            self.config.counter += len(active)
+            for i, k in zip(active, keep.tolist()):
+                result[i] = int(k)
+        return result
+
+    def transform_batch(self, batch: SentenceBatch) -> SentenceBatch:
+        # tokens of passthrough sentences are left as they are, and only
+        # the tokens that would be checked one by one draw a number
+        sentence_active = batch.token_sentence_passthrough == 0
+        active = sentence_active & (batch.passthrough == 0)
+        n_active = int(np.count_nonzero(active))
+        increment = sentence_active.astype(np.int32)
+        if n_active:
+            effects = self.config.get_effects(batch)[active]
+            increment[active] = effects < self.config.rand(n_active)
+            self.config.counter += n_active
+        return batch.replace(passthrough=batch.passthrough + increment)
+
 
 class SequentialTokenFilterTransform(SequentialTokenFilterTransformBase):
     pass
@@ -100,8 +186,10 @@ class StochasticTokenFilterTransform(StochasticTokenFilterTransformBase):
 
 
 class SequentialTokenFilterByPosTransform(SequentialTokenFilterTransformBase):
-    pass
+    config_class = SequentialTokenPosFilterConfig
+    config: SequentialTokenPosFilterConfig
 
 
 class StochasticTokenFilterByPosTransform(StochasticTokenFilterTransformBase):
-    pass
+    config_class = StochasticTokenPosFilterConfig
+    config: StochasticTokenPosFilterConfig
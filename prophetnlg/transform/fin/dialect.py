@@ -39,6 +39,7 @@ class FinDialectConfig(ConfigBase):
 class FinDialectTransform(SentenceToTextTransform):
     config_class = FinDialectConfig
     config: FinDialectConfig
+    stateless = True
 
     def get_text(self, sentence: Sentence) -> str:
         return murre.dialectalize_sentence(sentence.as_text(), self.config.dialect)
@@ -50,6 +51,8 @@ class FinDialectTransform(SentenceToTextTransform):
 
 
 class FinNormalizeDialectTransform(SentenceToTextTransform):
+    stateless = True
+
     def get_text(self, sentence: Sentence) -> str:
         return murre.normalize_sentence(sentence.as_text())
 
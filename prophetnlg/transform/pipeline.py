@@ -0,0 +1,406 @@
+import queue
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+from prophetnlg import Sentence
+from .base import RoutingTransformBase, TransformBase
+
+DEFAULT_BUFFER_SIZE = 1024
+DEFAULT_CHUNK_SIZE = 64
+# how often blocked stages check whether the run was stopped
+POLL_SECONDS = 0.1
+
+# a reference is a source name, a stage name when the stage has one
+# output or 'stage.port', and a list of references is merged in arrival order
+Ref = Union[str, Sequence[str]]
+
+
+class PipelineError(Exception):
+    pass
+
+
+class PipelineStopped(PipelineError):
+    pass
+
+
+class StageStats:
+    # seconds are spent in the stage itself, time spent waiting for its
+    # inputs or for room in its output buffers is excluded
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.total_seconds = 0.0
+        self.input_seconds = 0.0
+
+    @property
+    def seconds(self) -> float:
+        return max(self.total_seconds - self.input_seconds, 0.0)
+
+    @property
+    def throughput(self) -> float:
+        return self.items / self.seconds if self.seconds else 0.0
+
+    def __repr__(self) -> str:
+        return f'StageStats({self.name!r}, items={self.items}, seconds={self.seconds:.3f}, throughput={self.throughput:.1f}/s)'
+
+
+class RunState:
+    # shared by the threads of one run, the first error stops all of them
+    def __init__(self):
+        self.stopped = threading.Event()
+        self.error: Optional[BaseException] = None
+
+    def stop(self, error: Optional[BaseException] = None):
+        if not self.stopped.is_set():
+            self.error = error
+            self.stopped.set()
+
+
+_END = object()
+
+
+class Channel:
+    # Bounded queue of item chunks into one input port. put blocks while the
+    # queue is full, which holds back the producer and the stages before it,
+    # so a slow branch slows the run down instead of filling memory.
+    def __init__(self, state: RunState, buffer_size: int, chunk_size: int, producers: int = 1):
+        self.state = state
+        self.chunk_size = max(1, min(chunk_size, buffer_size))
+        self.queue: queue.Queue = queue.Queue(max(1, buffer_size // self.chunk_size))
+        self.producers = producers
+        self.chunk: List[Any] = []
+        # chunks taken from self.chunk but not yet in the queue. The lock is
+        # only held to swap chunks, so one producer blocked on a full queue
+        # doesn't hold back the others.
+        self.pending = 0
+        self.lock = threading.Condition()
+
+    def _put(self, value: Any):
+        while True:
+            try:
+                self.queue.put(value, timeout=POLL_SECONDS)
+                return
+            except queue.Full:
+                if self.state.stopped.is_set():
+                    raise PipelineStopped()
+
+    def _put_chunk(self, chunk: List[Any]):
+        try:
+            self._put(chunk)
+        finally:
+            with self.lock:
+                self.pending -= 1
+                self.lock.notify_all()
+
+    def put(self, item: Any):
+        with self.lock:
+            self.chunk.append(item)
+            if len(self.chunk) < self.chunk_size:
+                return
+            chunk, self.chunk = self.chunk, []
+            self.pending += 1
+        self._put_chunk(chunk)
+
+    def close(self):
+        with self.lock:
+            self.producers -= 1
+            chunk, self.chunk = self.chunk, []
+            last = not self.producers
+            if chunk:
+                self.pending += 1
+        if chunk:
+            self._put_chunk(chunk)
+        if last:
+            # the end goes after the chunks other producers are still putting
+            with self.lock:
+                while self.pending:
+                    self.lock.wait(POLL_SECONDS)
+                    if self.state.stopped.is_set():
+                        raise PipelineStopped()
+            self._put(_END)
+
+    def __iter__(self) -> Iterator[Any]:
+        while True:
+            try:
+                value = self.queue.get(timeout=POLL_SECONDS)
+            except queue.Empty:
+                if self.state.stopped.is_set():
+                    raise self.state.error or PipelineStopped('pipeline was stopped')
+                continue
+            if value is _END:
+                return
+            yield from value
+
+
+class TaggedChannel:
+    # puts (key, item) pairs to a channel shared by several outputs
+    def __init__(self, channel: Channel, key: str):
+        self.channel = channel
+        self.key = key
+
+    def put(self, item: Any):
+        self.channel.put((self.key, item))
+
+    def close(self):
+        self.channel.close()
+
+
+def _compatible(output: Any, input: Any) -> bool:
+    if output is Any or input is Any or output == input:
+        return True
+    return isinstance(output, type) and isinstance(input, type) and issubclass(output, input)
+
+
+class Stage:
+    def __init__(self, name: str, transform: TransformBase, inputs: Dict[str, List[str]], workers: int = 1):
+        self.name = name
+        self.transform = transform
+        # input port -> output keys ('stage.port' or source name)
+        self.inputs = inputs
+        self.outputs = dict(transform.get_outputs())
+        # only stateless transforms are split between workers
+        self.workers = workers if transform.is_stateless() else 1
+
+
+class Pipeline:
+    # A graph of transforms wired by their declared inputs and outputs.
+    # Stages are added in order, so each can only use sources and earlier
+    # stages, and outputs nobody uses are the sinks. Each source and stage
+    # runs in a thread of its own and passes items on through bounded
+    # channels, an output used by several stages is put to each of their
+    # channels, and stages with several outputs must route each item to one
+    # of them.
+    def __init__(
+        self,
+        sources: Optional[Mapping[str, Any]] = None,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ):
+        self.sources = dict(sources or {'sentence': Sentence})
+        self.buffer_size = buffer_size
+        self.chunk_size = chunk_size
+        self.stages: Dict[str, Stage] = {}
+        self.stats: Dict[str, StageStats] = {}
+
+    def _output_type(self, key: str) -> Any:
+        if key in self.sources:
+            return self.sources[key]
+        name, _, port = key.rpartition('.')
+        return self.stages[name].outputs[port]
+
+    def _resolve(self, ref: str) -> str:
+        if ref in self.sources:
+            return ref
+        if ref in self.stages:
+            outputs = self.stages[ref].outputs
+            if len(outputs) != 1:
+                raise PipelineError(f'stage {ref!r} has outputs {list(outputs)}, name one as {ref}.<port>')
+            return f'{ref}.{next(iter(outputs))}'
+        name, _, port = ref.rpartition('.')
+        if name in self.stages and port in self.stages[name].outputs:
+            return ref
+        raise PipelineError(f'unknown source or stage output {ref!r}')
+
+    def _last_output(self) -> str:
+        if self.stages:
+            return list(self.stages)[-1]
+        if len(self.sources) == 1:
+            return next(iter(self.sources))
+        raise PipelineError('the first stage must name its inputs when there are several sources')
+
+    def add(
+        self,
+        name: str,
+        transform: TransformBase,
+        inputs: Union[None, Ref, Mapping[str, Ref]] = None,
+        workers: int = 1
+    ) -> 'Pipeline':
+        # inputs default to the output of the previous stage, a reference
+        # or list of them is for a transform with one input port
+        if name in self.stages or name in self.sources or '.' in name:
+            raise PipelineError(f'invalid or duplicate stage name {name!r}')
+        if len(transform.get_outputs()) > 1 and not isinstance(transform, RoutingTransformBase):
+            raise PipelineError(f'stage {name!r} has several outputs but does not route its items')
+        ports = transform.get_inputs()
+        if isinstance(transform, RoutingTransformBase) and len(ports) != 1:
+            raise PipelineError(f'routing stage {name!r} must have one input')
+        if inputs is None:
+            inputs = self._last_output()
+        if not isinstance(inputs, Mapping):
+            if len(ports) != 1:
+                raise PipelineError(f'stage {name!r} has inputs {list(ports)}, wire them by name')
+            inputs = {next(iter(ports)): inputs}
+        if set(inputs) != set(ports):
+            raise PipelineError(f'stage {name!r} has inputs {list(ports)}, got {list(inputs)}')
+
+        wiring = {}
+        for port, refs in inputs.items():
+            keys = [self._resolve(r) for r in ([refs] if isinstance(refs, str) else refs)]
+            if not keys:
+                raise PipelineError(f'input {name}.{port} is not connected')
+            for key in keys:
+                if not _compatible(self._output_type(key), ports[port]):
+                    raise PipelineError(
+                        f'{key} gives {self._output_type(key)}, input {name}.{port} takes {ports[port]}'
+                    )
+            wiring[port] = keys
+        self.stages[name] = Stage(name, transform, wiring, workers)
+        return self
+
+    @property
+    def sinks(self) -> List[str]:
+        used = {key for stage in self.stages.values() for keys in stage.inputs.values() for key in keys}
+        return [
+            f'{stage.name}.{port}'
+            for stage in self.stages.values()
+            for port in stage.outputs
+            if f'{stage.name}.{port}' not in used
+        ]
+
+    def _timed_input(self, iterator: Iterable, stats: StageStats) -> Iterator:
+        iterator = iter(iterator)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                stats.input_seconds += time.perf_counter() - start
+            yield item
+
+    def _timed_output(self, iterable: Iterable, stats: StageStats) -> Iterator:
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                stats.total_seconds += time.perf_counter() - start
+            stats.items += 1
+            yield item
+
+    def _run_source(self, state: RunState, stream: Iterable, outputs: List[Channel]):
+        try:
+            for item in stream:
+                for channel in outputs:
+                    channel.put(item)
+            for channel in outputs:
+                channel.close()
+        except PipelineStopped:
+            pass
+        except BaseException as e:
+            state.stop(e)
+
+    def _run_stage(self, state: RunState, stage: Stage, inputs: Dict[str, Channel], outputs: Dict[str, List[Channel]]):
+        stats = self.stats[stage.name]
+        args = {port: self._timed_input(channel, stats) for port, channel in inputs.items()}
+        try:
+            transform = stage.transform
+            if isinstance(transform, RoutingTransformBase):
+                route = transform.route
+                for item in next(iter(args.values())):
+                    start = time.perf_counter()
+                    port = route(item)
+                    stats.total_seconds += time.perf_counter() - start
+                    if port is not None:
+                        stats.items += 1
+                        for channel in outputs[port]:
+                            channel.put(item)
+            else:
+                if stage.workers > 1:
+                    result = transform.transform_stream(*args.values(), workers=stage.workers)
+                elif len(args) == 1:
+                    result = transform.transform_stream(*args.values())
+                else:
+                    result = transform.transform_stream(**args)
+                (port,) = stage.outputs
+                channels = outputs[port]
+                for item in self._timed_output(result, stats):
+                    for channel in channels:
+                        channel.put(item)
+            for channels in outputs.values():
+                for channel in channels:
+                    channel.close()
+        except PipelineStopped:
+            pass
+        except BaseException as e:
+            state.stop(e)
+
+    def _start(self, sources: Mapping[str, Iterable], sinks: Mapping[str, Union[Channel, TaggedChannel]], state: RunState):
+        if set(sources) != set(self.sources):
+            raise PipelineError(f'pipeline takes sources {list(self.sources)}, got {list(sources)}')
+        # the channel of each stage input and the channels each output feeds
+        inputs: Dict[str, Dict[str, Channel]] = {}
+        outputs: Dict[str, List[Any]] = {key: [] for key in self.sources}
+        for stage in self.stages.values():
+            for port in stage.outputs:
+                outputs[f'{stage.name}.{port}'] = []
+        for stage in self.stages.values():
+            inputs[stage.name] = {}
+            for port, keys in stage.inputs.items():
+                channel = Channel(state, self.buffer_size, self.chunk_size, producers=len(keys))
+                inputs[stage.name][port] = channel
+                for key in keys:
+                    outputs[key].append(channel)
+        for key, channel in sinks.items():
+            outputs[key].append(channel)
+
+        self.stats = {name: StageStats(name) for name in self.stages}
+        threads = [
+            threading.Thread(
+                target=self._run_source, args=(state, sources[key], outputs[key]), name=f'pipeline-{key}'
+            )
+            for key in self.sources
+            if outputs[key]
+        ]
+        for stage in self.stages.values():
+            stage_outputs = {port: outputs[f'{stage.name}.{port}'] for port in stage.outputs}
+            threads.append(threading.Thread(
+                target=self._run_stage, args=(state, stage, inputs[stage.name], stage_outputs),
+                name=f'pipeline-{stage.name}'
+            ))
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+    def _read(self, channel: Channel, state: RunState) -> Iterator:
+        # closing the stream early stops the whole run
+        finished = False
+        try:
+            yield from channel
+            finished = True
+        finally:
+            if not finished:
+                state.stop()
+
+    def run(self, **sources: Iterable) -> Dict[str, Iterator]:
+        # streams of the sinks. They share the buffers before them, so with
+        # several sinks read them in step (or use drain), a sink that is not
+        # read blocks the others once its channel is full.
+        state = RunState()
+        channels = {key: Channel(state, self.buffer_size, self.chunk_size) for key in self.sinks}
+        self._start(sources, channels, state)
+        return {key: self._read(channel, state) for key, channel in channels.items()}
+
+    def stream(self, **sources: Iterable) -> Iterator:
+        if len(self.sinks) != 1:
+            raise PipelineError(f'pipeline has sinks {self.sinks}, use run or drain')
+        return next(iter(self.run(**sources).values()))
+
+    def drain(self, **sources: Iterable) -> Dict[str, int]:
+        # reads all sinks from one channel in the order items arrive, so no
+        # sink is waited for while another one is full, and returns the
+        # number of items from each
+        sinks = self.sinks
+        if not sinks:
+            raise PipelineError('pipeline has no sinks')
+        state = RunState()
+        channel = Channel(state, self.buffer_size, self.chunk_size, producers=len(sinks))
+        self._start(sources, {key: TaggedChannel(channel, key) for key in sinks}, state)
+        counts = dict.fromkeys(sinks, 0)
+        for key, _ in self._read(channel, state):
+            counts[key] += 1
+        return counts
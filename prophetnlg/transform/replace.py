@@ -26,6 +26,8 @@ class LemmaReplaceStreamConfig(LemmaStreamConfig):
 
 class LemmaMapStreamConfig(LemmaStreamConfig):
     lemma_mappings: Mapping[str, Mapping[str, SentenceToken]] = defaultdict(dict)
+    # only use the given mappings, lemmas without one are kept
+    frozen: bool = False
 
 
 class LemmaMapReplaceTransformBase(SentenceTransformBase):
@@ -72,6 +74,19 @@ class LemmaMapStreamTransform(LemmaMapReplaceTransformBase):
     config_class = LemmaMapStreamConfig
     config: LemmaMapStreamConfig
 
+    def is_stateless(self) -> bool:
+        return self.config.frozen
+
+    def _replace(self, token: SentenceToken) -> SentenceToken:
+        if not self.config.frozen:
+            return super()._replace(token)
+        if token.passthrough:
+            return token
+        replacement = self.config.lemma_mappings.get(token.pos, {}).get(token.lemma)
+        if not replacement:
+            return token
+        return self.config.generator.token_with_new_lemma(token, replacement)
+
     def get_replacement(self, token: SentenceToken) -> SentenceToken:
         pos = token.pos
         replacement = self.config.lemma_mappings[pos].get(token.lemma)